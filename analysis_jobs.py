@@ -0,0 +1,191 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+JOBS_DB = os.getenv("JOBS_DB", "analysis_jobs.db")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+
+
+class JobReporter:
+    """Handed to the pipeline so it can record its stage, progress, notes and streamed partial results."""
+
+    def __init__(self, job_queue, job_id):
+        self.job_queue = job_queue
+        self.job_id = job_id
+        self._stage = None
+        self._stage_started = None
+        self.timings = {}
+
+    def stage(self, name, progress):
+        now = time.time()
+        if self._stage is not None:
+            self.timings[self._stage] = round(now - self._stage_started, 3)
+        self._stage, self._stage_started = name, now
+        self.job_queue._update(self.job_id, stage=name, progress=progress, stage_timings=json.dumps(self.timings))
+
+    def partial(self, event):
+        """Record a streamed ("qa", category, qa) event so pollers can show it early."""
+        _, category_name, qa = event
+        self.job_queue._append_json(self.job_id, "partial", {"category": category_name, "qa": qa})
+
+    def note(self, message):
+        """Record a warning or informational message against the current stage."""
+        self.job_queue._append_json(self.job_id, "notes", {"stage": self._stage, "message": message})
+
+    def finish(self):
+        if self._stage is not None:
+            self.timings[self._stage] = round(time.time() - self._stage_started, 3)
+        return json.dumps(self.timings)
+
+
+class AnalysisJobQueue:
+    """
+    Local job queue for interview analyses. Jobs run on a worker pool and their state
+    lives in a SQLite jobs table, so results survive Streamlit reruns and several
+    interviews can be processed at once. `pipeline(job, reporter)` does the work for a
+    job dict (id, candidate_email, video_link, ...) and returns a JSON-serializable result.
+    """
+
+    def __init__(self, pipeline, db_path=JOBS_DB, workers=JOB_WORKERS):
+        self.pipeline = pipeline
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis-job")
+        self._initialize_db()
+        self._recover()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _initialize_db(self):
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                candidate_email TEXT NOT NULL,
+                video_link TEXT NOT NULL,
+                status TEXT NOT NULL CHECK(status IN ('queued', 'running', 'completed', 'failed')),
+                stage TEXT,
+                progress REAL NOT NULL DEFAULT 0,
+                stage_timings TEXT NOT NULL DEFAULT '{}',
+                partial TEXT NOT NULL DEFAULT '[]',
+                notes TEXT NOT NULL DEFAULT '[]',
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_candidate ON jobs (candidate_email, created_at);
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+            """)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "notes" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN notes TEXT NOT NULL DEFAULT '[]'")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _recover(self):
+        """Fail jobs a previous process was running and re-queue the ones it never started."""
+        self._update_where("status = 'running'", status="failed", error="Interrupted by an app restart",
+                           finished_at=time.time())
+        conn = self._connect()
+        try:
+            queued = [row["id"] for row in conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at")]
+        finally:
+            conn.close()
+        for job_id in queued:
+            self._executor.submit(self._run, job_id)
+
+    def _update(self, job_id, **fields):
+        self._update_where("id = ?", (job_id,), **fields)
+
+    def _update_where(self, condition, params=(), **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute(f"UPDATE jobs SET {assignments} WHERE {condition}", (*fields.values(), *params))
+                conn.commit()
+            finally:
+                conn.close()
+
+    def _append_json(self, job_id, column, item):
+        """Append `item` to a JSON array column (partial or notes)."""
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute(f"UPDATE jobs SET {column} = json_insert({column}, '$[#]', json(?)) WHERE id = ?",
+                             (json.dumps(item), job_id))
+                conn.commit()
+            finally:
+                conn.close()
+
+    def submit(self, candidate_email, video_link):
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT INTO jobs (id, candidate_email, video_link, status, created_at) VALUES (?, ?, ?, 'queued', ?)",
+                    (job_id, candidate_email, video_link, time.time()),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        self._executor.submit(self._run, job_id)
+        return job_id
+
+    def _run(self, job_id):
+        job = self.get(job_id)
+        if job is None or job["status"] != "queued":
+            return
+        self._update(job_id, status="running", started_at=time.time())
+        reporter = JobReporter(self, job_id)
+        try:
+            result = self.pipeline(job, reporter)
+            self._update(job_id, status="completed", stage="done", progress=1.0, result=json.dumps(result),
+                         stage_timings=reporter.finish(), finished_at=time.time())
+        except Exception as e:
+            self._update(job_id, status="failed", error=str(e) or type(e).__name__,
+                         stage_timings=reporter.finish(), finished_at=time.time())
+
+    def _row_to_job(self, row):
+        if row is None:
+            return None
+        job = dict(row)
+        job["stage_timings"] = json.loads(job["stage_timings"])
+        job["partial"] = json.loads(job["partial"])
+        job["notes"] = json.loads(job["notes"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def get(self, job_id):
+        conn = self._connect()
+        try:
+            return self._row_to_job(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+        finally:
+            conn.close()
+
+    def latest_for(self, candidate_email):
+        conn = self._connect()
+        try:
+            return self._row_to_job(conn.execute(
+                "SELECT * FROM jobs WHERE candidate_email = ? ORDER BY created_at DESC LIMIT 1",
+                (candidate_email,),
+            ).fetchone())
+        finally:
+            conn.close()
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
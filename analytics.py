@@ -1,26 +1,237 @@
+import csv
+import io
+import json
+import os
 import sqlite3
+import threading
+from itertools import islice
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 import random
 import streamlit as st
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 import math
 
+from candidate_snapshot import load_snapshot_rollup, read_change_counters, read_manifest, snapshot_dir_for
+
+# Pragmas applied to the analyzer's long-lived connection. WAL lets dashboard
+# readers run concurrently with writers, and the cache/mmap sizes keep hot
+# pages of the candidates table in memory between reruns.
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-65536',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA busy_timeout=5000',
+)
+
+
+CANDIDATE_COLUMNS = ('name', 'gender', 'job_role', 'status', 'company', 'interview_date')
+VALID_GENDERS = ('Male', 'Female', 'Other')
+VALID_STATUSES = ('Selected', 'Rejected', 'Declined by Candidate', 'Declined by Panel')
+
+
+# Pre-aggregated candidate counts at (company, job_role, gender, status, interview_date)
+# grain. The triggers keep it in step with the candidates table so the dashboard
+# queries scale with the number of groups instead of the number of candidates.
+# Lookups use IS so rows with NULL dimensions are rolled up like any other value.
+ROLLUP_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS candidate_rollup (
+        company TEXT,
+        job_role TEXT,
+        gender TEXT,
+        status TEXT,
+        interview_date DATE,
+        candidate_count INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_candidate_rollup_group
+        ON candidate_rollup (company, job_role, gender, status, interview_date);
+
+    CREATE TRIGGER IF NOT EXISTS candidates_rollup_insert AFTER INSERT ON candidates
+    BEGIN
+        INSERT INTO candidate_rollup (company, job_role, gender, status, interview_date, candidate_count)
+        SELECT NEW.company, NEW.job_role, NEW.gender, NEW.status, NEW.interview_date, 0
+        WHERE NOT EXISTS (
+            SELECT 1 FROM candidate_rollup
+            WHERE company IS NEW.company AND job_role IS NEW.job_role AND gender IS NEW.gender
+              AND status IS NEW.status AND interview_date IS NEW.interview_date
+        );
+        UPDATE candidate_rollup SET candidate_count = candidate_count + 1
+        WHERE company IS NEW.company AND job_role IS NEW.job_role AND gender IS NEW.gender
+          AND status IS NEW.status AND interview_date IS NEW.interview_date;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS candidates_rollup_delete AFTER DELETE ON candidates
+    BEGIN
+        UPDATE candidate_rollup SET candidate_count = candidate_count - 1
+        WHERE company IS OLD.company AND job_role IS OLD.job_role AND gender IS OLD.gender
+          AND status IS OLD.status AND interview_date IS OLD.interview_date;
+        DELETE FROM candidate_rollup
+        WHERE company IS OLD.company AND job_role IS OLD.job_role AND gender IS OLD.gender
+          AND status IS OLD.status AND interview_date IS OLD.interview_date
+          AND candidate_count <= 0;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS candidates_rollup_update
+    AFTER UPDATE OF company, job_role, gender, status, interview_date ON candidates
+    BEGIN
+        UPDATE candidate_rollup SET candidate_count = candidate_count - 1
+        WHERE company IS OLD.company AND job_role IS OLD.job_role AND gender IS OLD.gender
+          AND status IS OLD.status AND interview_date IS OLD.interview_date;
+        INSERT INTO candidate_rollup (company, job_role, gender, status, interview_date, candidate_count)
+        SELECT NEW.company, NEW.job_role, NEW.gender, NEW.status, NEW.interview_date, 0
+        WHERE NOT EXISTS (
+            SELECT 1 FROM candidate_rollup
+            WHERE company IS NEW.company AND job_role IS NEW.job_role AND gender IS NEW.gender
+              AND status IS NEW.status AND interview_date IS NEW.interview_date
+        );
+        UPDATE candidate_rollup SET candidate_count = candidate_count + 1
+        WHERE company IS NEW.company AND job_role IS NEW.job_role AND gender IS NEW.gender
+          AND status IS NEW.status AND interview_date IS NEW.interview_date;
+        DELETE FROM candidate_rollup
+        WHERE company IS OLD.company AND job_role IS OLD.job_role AND gender IS OLD.gender
+          AND status IS OLD.status AND interview_date IS OLD.interview_date
+          AND candidate_count <= 0;
+    END;
+'''
+
+
+# Change counters for the candidates table, plus a random id minted with the table.
+# Snapshots record them in their manifest, so any insert, update or delete since the
+# export is detected (appends alone can be added incrementally, while edits invalidate
+# the snapshot until it is fully re-exported) and a snapshot of another database is ignored.
+CHANGE_COUNTER_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS candidate_changes (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        inserts INTEGER NOT NULL DEFAULT 0,
+        edits INTEGER NOT NULL DEFAULT 0,
+        db_id TEXT
+    );
+    INSERT OR IGNORE INTO candidate_changes (id) VALUES (1);
+    UPDATE candidate_changes SET db_id = lower(hex(randomblob(16))) WHERE id = 1 AND db_id IS NULL;
+
+    CREATE TRIGGER IF NOT EXISTS candidates_count_insert AFTER INSERT ON candidates
+    BEGIN
+        UPDATE candidate_changes SET inserts = inserts + 1 WHERE id = 1;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS candidates_count_update AFTER UPDATE ON candidates
+    BEGIN
+        UPDATE candidate_changes SET edits = edits + 1 WHERE id = 1;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS candidates_count_delete AFTER DELETE ON candidates
+    BEGIN
+        UPDATE candidate_changes SET edits = edits + 1 WHERE id = 1;
+    END;
+'''
+
+
+# Sort key of the paginated detail view. Undated candidates sort first as '', so the
+# keyset comparison (DETAIL_DATE_KEY, id) > (?, ?) never meets a NULL and every row is
+# reachable by paging.
+DETAIL_DATE_KEY = "COALESCE(interview_date, '')"
+
+# Composite indexes for the paginated detail view. Each ends in DETAIL_DATE_KEY so the
+# equality filters plus a date range and keyset ORDER BY DETAIL_DATE_KEY, id are served
+# straight from the index (the rowid is implicitly the last index column).
+DETAIL_INDEXES = f'''
+    CREATE INDEX IF NOT EXISTS idx_candidates_date_key ON candidates ({DETAIL_DATE_KEY});
+    CREATE INDEX IF NOT EXISTS idx_candidates_company_date_key ON candidates (company, {DETAIL_DATE_KEY});
+    CREATE INDEX IF NOT EXISTS idx_candidates_role_date_key ON candidates (job_role, {DETAIL_DATE_KEY});
+    CREATE INDEX IF NOT EXISTS idx_candidates_company_role_date_key
+        ON candidates (company, job_role, {DETAIL_DATE_KEY});
+'''
+
+# Plain interview_date indexes from before DETAIL_DATE_KEY; the keyset queries no longer use them.
+LEGACY_DETAIL_INDEXES = ('idx_candidates_date', 'idx_candidates_company_date', 'idx_candidates_role_date',
+                         'idx_candidates_company_role_date')
+
+DETAIL_PAGE_SIZE = 50
+
+
+def _validate_candidate_row(index, row):
+    """Check a row against the table's CHECK constraints before it reaches SQLite."""
+    if isinstance(row, dict):
+        row = tuple(row.get(column) for column in CANDIDATE_COLUMNS)
+    else:
+        row = tuple(row)
+    if len(row) != len(CANDIDATE_COLUMNS):
+        raise ValueError(f"Row {index}: expected {len(CANDIDATE_COLUMNS)} fields, got {len(row)}")
+    if row[1] not in VALID_GENDERS:
+        raise ValueError(f"Row {index}: invalid gender {row[1]!r}")
+    if row[3] not in VALID_STATUSES:
+        raise ValueError(f"Row {index}: invalid status {row[3]!r}")
+    return row
+
+
 class CandidateAnalyzer:
-    def __init__(self, db_name='candidate_analysis.db'):
+    def __init__(self, db_name='candidate_analysis.db', snapshot_dir=None, seed_if_empty=True):
         self.db_name = db_name
+        self.snapshot_dir = snapshot_dir or snapshot_dir_for(db_name)
+        self._lock = threading.RLock()
+        self._conn = self._connect()
+        self._write_count = 0
+        self._query_cache = {}
+        self._cache_version = None
         self._initialize_db()
-        if self.is_database_empty():
+        if seed_if_empty and self.is_database_empty():
             self.generate_fake_data(50)
 
+    def _connect(self):
+        """Open the single connection shared by every analyzer method."""
+        conn = sqlite3.connect(self.db_name, check_same_thread=False, cached_statements=256)
+        for pragma in SQLITE_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        """Serialize access to the shared connection across Streamlit threads."""
+        with self._lock:
+            yield self._conn
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def data_version(self):
+        """
+        Return a token that changes whenever the candidates data may have changed.
+        PRAGMA data_version tracks commits from other connections; our own writes
+        are tracked by a local counter because they do not bump it.
+        """
+        with self._connection() as conn:
+            return conn.execute('PRAGMA data_version').fetchone()[0], self._write_count
+
+    def _mark_written(self):
+        self._write_count += 1
+
+    def _cached(self, key, loader):
+        """Serve a query result from memory until the database changes."""
+        with self._lock:
+            version = self.data_version()
+            if version != self._cache_version:
+                self._query_cache.clear()
+                self._cache_version = version
+            if key not in self._query_cache:
+                self._query_cache[key] = loader()
+            result = self._query_cache[key]
+            if isinstance(result, dict):
+                return {name: value.copy() for name, value in result.items()}
+            return result.copy()
+
     def is_database_empty(self):
-        with sqlite3.connect(self.db_name) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT COUNT(*) FROM candidates')
+            cursor.execute('SELECT EXISTS (SELECT 1 FROM candidates)')
             return cursor.fetchone()[0] == 0
 
     def _initialize_db(self):
-        with sqlite3.connect(self.db_name) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS candidates (
@@ -33,16 +244,99 @@ class CandidateAnalyzer:
                     interview_date DATE
                 )
             ''')
+            rollup_exists = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'candidate_rollup'"
+            ).fetchone()
+            cursor.executescript(ROLLUP_SCHEMA)
+            change_columns = {row[1] for row in cursor.execute('PRAGMA table_info(candidate_changes)')}
+            if change_columns and 'db_id' not in change_columns:
+                cursor.execute('ALTER TABLE candidate_changes ADD COLUMN db_id TEXT')
+            cursor.executescript(CHANGE_COUNTER_SCHEMA)
+            for index_name in LEGACY_DETAIL_INDEXES:
+                cursor.execute(f'DROP INDEX IF EXISTS "{index_name}"')
+            cursor.executescript(DETAIL_INDEXES)
+            if not rollup_exists:
+                self._rebuild_rollups(conn)
             conn.commit()
 
+    def _rebuild_rollups(self, conn):
+        conn.execute('DELETE FROM candidate_rollup')
+        conn.execute('''
+            INSERT INTO candidate_rollup (company, job_role, gender, status, interview_date, candidate_count)
+            SELECT company, job_role, gender, status, interview_date, COUNT(*)
+            FROM candidates
+            GROUP BY company, job_role, gender, status, interview_date
+        ''')
+
+    def refresh_rollups(self):
+        """Recompute candidate_rollup from scratch, e.g. after editing the table with triggers disabled."""
+        with self._connection() as conn:
+            self._rebuild_rollups(conn)
+            # Whatever was edited out of band is invisible to the change triggers
+            conn.execute('UPDATE candidate_changes SET edits = edits + 1 WHERE id = 1')
+            conn.commit()
+            self._mark_written()
+
     def add_candidate(self, name, gender, job_role, status, company, interview_date):
-        with sqlite3.connect(self.db_name) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO candidates (name, gender, job_role, status, company, interview_date)
                 VALUES (?, ?, ?, ?, ?, ?)
             ''', (name, gender, job_role, status, company, interview_date))
             conn.commit()
+            self._mark_written()
+
+    def add_candidates(self, rows, chunk_size=10000, rebuild_indexes=False):
+        """
+        Bulk insert candidates in a single transaction.
+        `rows` may be any iterable of tuples in CANDIDATE_COLUMNS order or dicts keyed by
+        column name; it is consumed in chunks so arbitrarily large inputs stream through.
+        With `rebuild_indexes`, indexes on the candidates table are dropped for the load
+        and recreated afterwards. Returns the number of inserted rows.
+        """
+        validated = (_validate_candidate_row(i, row) for i, row in enumerate(rows, start=1))
+        inserted = 0
+        with self._connection() as conn:
+            index_sql = []
+            try:
+                conn.execute('BEGIN')
+                if rebuild_indexes:
+                    index_sql = conn.execute('''
+                        SELECT name, sql FROM sqlite_master
+                        WHERE type = 'index' AND tbl_name = 'candidates' AND sql IS NOT NULL
+                    ''').fetchall()
+                    for index_name, _ in index_sql:
+                        conn.execute(f'DROP INDEX "{index_name}"')
+                while True:
+                    chunk = list(islice(validated, chunk_size))
+                    if not chunk:
+                        break
+                    conn.executemany('''
+                        INSERT INTO candidates (name, gender, job_role, status, company, interview_date)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', chunk)
+                    inserted += len(chunk)
+                for _, sql in index_sql:
+                    conn.execute(sql)
+                conn.commit()
+                self._mark_written()
+            except Exception:
+                conn.rollback()
+                raise
+        return inserted
+
+    def import_candidates(self, file_path, chunk_size=10000, rebuild_indexes=False):
+        """Bulk load candidates from a CSV (with header) or JSONL file."""
+        extension = os.path.splitext(file_path)[1].lower()
+        with open(file_path, newline='', encoding='utf-8') as file:
+            if extension == '.csv':
+                rows = csv.DictReader(file)
+            elif extension in ('.jsonl', '.ndjson'):
+                rows = (json.loads(line) for line in file if line.strip())
+            else:
+                raise ValueError(f"Unsupported file format: {file_path}")
+            return self.add_candidates(rows, chunk_size=chunk_size, rebuild_indexes=rebuild_indexes)
 
     def generate_fake_data(self, num_candidates=50):
         first_names = ['John', 'Jane', 'Alex', 'Sarah', 'Mike', 'Emily', 'David', 'Lisa',
@@ -52,97 +346,317 @@ class CandidateAnalyzer:
         job_roles = ['SDE III', 'SDET I', 'EM']
         genders = ['Male', 'Female']
         start_date = datetime(2025, 4, 1)
-        for _ in range(num_candidates):
-            gender = random.choice(genders)
-            first_name = random.choice(first_names[:6] if gender == 'Male' else first_names[6:])
-            name = f"{first_name} {random.choice(last_names)}"
-            job_role = random.choice(job_roles)
-            status = random.choices(
-                ['Selected', 'Rejected', 'Declined by Candidate', 'Declined by Panel'],
-                weights=[0.3, 0.4, 0.2, 0.1]
-            )[0]
-            company = random.choice(companies)
-            interview_date = (start_date + timedelta(days=random.randint(0, 18))).strftime('%Y-%m-%d')
-            self.add_candidate(name, gender, job_role, status, company, interview_date)
-
-    def get_client_data(self, company=None):
-        with sqlite3.connect(self.db_name) as conn:
+
+        def fake_rows():
+            for _ in range(num_candidates):
+                gender = random.choice(genders)
+                first_name = random.choice(first_names[:6] if gender == 'Male' else first_names[6:])
+                name = f"{first_name} {random.choice(last_names)}"
+                job_role = random.choice(job_roles)
+                status = random.choices(
+                    ['Selected', 'Rejected', 'Declined by Candidate', 'Declined by Panel'],
+                    weights=[0.3, 0.4, 0.2, 0.1]
+                )[0]
+                company = random.choice(companies)
+                interview_date = (start_date + timedelta(days=random.randint(0, 18))).strftime('%Y-%m-%d')
+                yield name, gender, job_role, status, company, interview_date
+
+        self.add_candidates(fake_rows())
+
+    def get_client_data(self, company=None, start_date=None, end_date=None):
+        return self._cached(('client_data', company, start_date, end_date),
+                            lambda: self._query_client_data(company, start_date, end_date))
+
+    def get_role_summary(self, company=None, start_date=None, end_date=None):
+        return self._cached(('role_summary', company, start_date, end_date),
+                            lambda: self._query_role_summary(company, start_date, end_date))
+
+    def get_company_metrics(self, company=None, start_date=None, end_date=None):
+        return self._cached(('company_metrics', company, start_date, end_date),
+                            lambda: self._query_company_metrics(company, start_date, end_date))
+
+    def get_dashboard_metrics(self, company=None):
+        """Return every aggregate the dashboard needs, computed from one rollup scan."""
+        return self._cached(('dashboard_metrics', company),
+                            lambda: compute_dashboard_metrics(self._query_rollup_frame(), company))
+
+    def _snapshot_rollup_frame(self):
+        """
+        Use the memory-mapped snapshot rollup when it was exported from this database and
+        nothing has been inserted, updated or deleted since, which lets a cold start render
+        without aggregating in SQLite. Anything else falls back to the live rollup until the
+        snapshot is refreshed.
+        """
+        manifest = read_manifest(self.snapshot_dir)
+        if manifest is None:
+            return None
+        with self._connection() as conn:
+            changes = read_change_counters(conn)
+        if changes is None or manifest.get('changes') != changes:
+            return None
+        rollup = load_snapshot_rollup(self.snapshot_dir)
+        if rollup is None:
+            return None
+        rollup = rollup.astype({'company': 'category', 'job_role': 'category', 'gender': 'category',
+                                'status': 'category', 'candidate_count': 'int64'})
+        # The snapshot keeps per-date rows; collapse them like the SQL path does
+        return rollup.groupby(['company', 'job_role', 'gender', 'status'], observed=True, dropna=False,
+                              as_index=False)['candidate_count'].sum()
+
+    def _query_rollup_frame(self):
+        snapshot = self._snapshot_rollup_frame()
+        if snapshot is not None:
+            return snapshot
+        with self._connection() as conn:
+            return pd.read_sql('''
+                SELECT company, job_role, gender, status, SUM(candidate_count) AS candidate_count
+                FROM candidate_rollup
+                GROUP BY company, job_role, gender, status
+            ''', conn, dtype={
+                'company': 'category',
+                'job_role': 'category',
+                'gender': 'category',
+                'status': 'category',
+                'candidate_count': 'int64',
+            })
+
+    def get_candidate_page(self, company=None, job_role=None, start_date=None, end_date=None,
+                           after=None, page_size=DETAIL_PAGE_SIZE):
+        """
+        Fetch one page of candidate rows ordered by (interview_date, id), undated rows first.
+        Pass the (interview_date, id) of the previous page's last row as `after` to get
+        the next page; the cost of a page does not depend on how deep it is. A date range
+        leaves out undated rows.
+        """
+        conditions = []
+        params = []
+        if company:
+            conditions.append("company = ?")
+            params.append(company)
+        if job_role:
+            conditions.append("job_role = ?")
+            params.append(job_role)
+        if start_date:
+            conditions.append(f"{DETAIL_DATE_KEY} >= ?")
+            params.append(str(start_date))
+        elif end_date:
+            conditions.append(f"{DETAIL_DATE_KEY} > ''")
+        if end_date:
+            conditions.append(f"{DETAIL_DATE_KEY} <= ?")
+            params.append(str(end_date))
+        if after:
+            after_date, after_id = after
+            conditions.append(f"({DETAIL_DATE_KEY}, id) > (?, ?)")
+            params.extend(('' if pd.isna(after_date) else str(after_date), after_id))
+        query = '''
+            SELECT id, name, gender, job_role, status, company, interview_date
+            FROM candidates
+        '''
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY {DETAIL_DATE_KEY}, id LIMIT ?"
+        params.append(page_size)
+        with self._connection() as conn:
+            return pd.read_sql(query, conn, params=params)
+
+    @staticmethod
+    def _rollup_filter(company=None, start_date=None, end_date=None):
+        """Build the WHERE clause and bound parameters for filtering candidate_rollup."""
+        conditions = []
+        params = []
+        if company:
+            conditions.append("company = ?")
+            params.append(company)
+        if start_date:
+            conditions.append("interview_date >= ?")
+            params.append(str(start_date))
+        if end_date:
+            conditions.append("interview_date <= ?")
+            params.append(str(end_date))
+        if not conditions:
+            return '', params
+        return " WHERE " + " AND ".join(conditions), params
+
+    def _query_client_data(self, company=None, start_date=None, end_date=None):
+        with self._connection() as conn:
             query = '''
                 SELECT 
                     company,
                     job_role,
                     gender,
-                    COUNT(CASE WHEN status = 'Selected' THEN 1 END) as selected,
-                    COUNT(CASE WHEN status = 'Rejected' THEN 1 END) as rejected,
-                    COUNT(CASE WHEN status = 'Declined by Candidate' THEN 1 END) as declined_by_candidate,
-                    COUNT(CASE WHEN status = 'Declined by Panel' THEN 1 END) as declined_by_panel,
-                    COUNT(*) as total
-                FROM candidates
+                    SUM(CASE WHEN status = 'Selected' THEN candidate_count ELSE 0 END) as selected,
+                    SUM(CASE WHEN status = 'Rejected' THEN candidate_count ELSE 0 END) as rejected,
+                    SUM(CASE WHEN status = 'Declined by Candidate' THEN candidate_count ELSE 0 END) as declined_by_candidate,
+                    SUM(CASE WHEN status = 'Declined by Panel' THEN candidate_count ELSE 0 END) as declined_by_panel,
+                    SUM(candidate_count) as total
+                FROM candidate_rollup
             '''
-            if company:
-                query += f" WHERE company = '{company}'"
+            where, params = self._rollup_filter(company, start_date, end_date)
+            query += where
             query += '''
                 GROUP BY company, job_role, gender
                 ORDER BY company, job_role, gender
             '''
-            return pd.read_sql(query, conn)
+            return pd.read_sql(query, conn, params=params)
 
-    def get_role_summary(self):
-        with sqlite3.connect(self.db_name) as conn:
+    def _query_role_summary(self, company=None, start_date=None, end_date=None):
+        where, params = self._rollup_filter(company, start_date, end_date)
+        with self._connection() as conn:
             return pd.read_sql('''
                 SELECT 
                     job_role,
                     gender,
-                    COUNT(CASE WHEN status = 'Selected' THEN 1 END) as selected,
-                    COUNT(*) as total,
-                    ROUND(COUNT(CASE WHEN status = 'Selected' THEN 1 END) * 100.0 / COUNT(*), 1) as selection_rate
-                FROM candidates
+                    SUM(CASE WHEN status = 'Selected' THEN candidate_count ELSE 0 END) as selected,
+                    SUM(candidate_count) as total,
+                    ROUND(SUM(CASE WHEN status = 'Selected' THEN candidate_count ELSE 0 END) * 100.0 / SUM(candidate_count), 1) as selection_rate
+                FROM candidate_rollup
+            ''' + where + '''
                 GROUP BY job_role, gender
                 ORDER BY job_role, gender
-            ''', conn)
+            ''', conn, params=params)
 
-    def get_company_metrics(self, company=None):
-        with sqlite3.connect(self.db_name) as conn:
+    def _query_company_metrics(self, company=None, start_date=None, end_date=None):
+        with self._connection() as conn:
             query = '''
                 SELECT 
                     company,
-                    COUNT(*) as total_candidates,
-                    COUNT(CASE WHEN status = 'Selected' THEN 1 END) as selected_count,
-                    COUNT(CASE WHEN status = 'Rejected' THEN 1 END) as rejected_count,
-                    COUNT(CASE WHEN status = 'Declined by Candidate' THEN 1 END) as declined_by_candidate,
-                    COUNT(CASE WHEN status = 'Declined by Panel' THEN 1 END) as declined_by_panel,
-                    ROUND(COUNT(CASE WHEN status = 'Selected' THEN 1 END) * 100.0 / COUNT(*), 1) as selection_rate,
-                    ROUND(COUNT(CASE WHEN status = 'Rejected' THEN 1 END) * 100.0 / COUNT(*), 1) as rejection_rate,
-                    COUNT(CASE WHEN gender = 'Male' THEN 1 END) as male_count,
-                    COUNT(CASE WHEN gender = 'Female' THEN 1 END) as female_count,
-                    COUNT(CASE WHEN gender = 'Male' AND status = 'Selected' THEN 1 END) as selected_male,
-                    COUNT(CASE WHEN gender = 'Female' AND status = 'Selected' THEN 1 END) as selected_female,
+                    SUM(candidate_count) as total_candidates,
+                    SUM(CASE WHEN status = 'Selected' THEN candidate_count ELSE 0 END) as selected_count,
+                    SUM(CASE WHEN status = 'Rejected' THEN candidate_count ELSE 0 END) as rejected_count,
+                    SUM(CASE WHEN status = 'Declined by Candidate' THEN candidate_count ELSE 0 END) as declined_by_candidate,
+                    SUM(CASE WHEN status = 'Declined by Panel' THEN candidate_count ELSE 0 END) as declined_by_panel,
+                    ROUND(SUM(CASE WHEN status = 'Selected' THEN candidate_count ELSE 0 END) * 100.0 / SUM(candidate_count), 1) as selection_rate,
+                    ROUND(SUM(CASE WHEN status = 'Rejected' THEN candidate_count ELSE 0 END) * 100.0 / SUM(candidate_count), 1) as rejection_rate,
+                    SUM(CASE WHEN gender = 'Male' THEN candidate_count ELSE 0 END) as male_count,
+                    SUM(CASE WHEN gender = 'Female' THEN candidate_count ELSE 0 END) as female_count,
+                    SUM(CASE WHEN gender = 'Male' AND status = 'Selected' THEN candidate_count ELSE 0 END) as selected_male,
+                    SUM(CASE WHEN gender = 'Female' AND status = 'Selected' THEN candidate_count ELSE 0 END) as selected_female,
                     CASE 
-                        WHEN COUNT(CASE WHEN status = 'Selected' THEN 1 END) > 0 
-                        THEN CEIL(COUNT(*) * 1.0 / COUNT(CASE WHEN status = 'Selected' THEN 1 END))
+                        WHEN SUM(CASE WHEN status = 'Selected' THEN candidate_count ELSE 0 END) > 0 
+                        THEN CEIL(SUM(candidate_count) * 1.0 / SUM(CASE WHEN status = 'Selected' THEN candidate_count ELSE 0 END))
                         ELSE 0
                     END as selection_ratio,
                     CASE 
-                        WHEN COUNT(CASE WHEN gender = 'Female' AND status = 'Selected' THEN 1 END) > 0 
-                        THEN CEIL(COUNT(CASE WHEN gender = 'Male' AND status = 'Selected' THEN 1 END) * 1.0 / 
-                                  COUNT(CASE WHEN gender = 'Female' AND status = 'Selected' THEN 1 END))
+                        WHEN SUM(CASE WHEN gender = 'Female' AND status = 'Selected' THEN candidate_count ELSE 0 END) > 0 
+                        THEN CEIL(SUM(CASE WHEN gender = 'Male' AND status = 'Selected' THEN candidate_count ELSE 0 END) * 1.0 / 
+                                  SUM(CASE WHEN gender = 'Female' AND status = 'Selected' THEN candidate_count ELSE 0 END))
                         ELSE 0
                     END as selection_diversity_ratio,
                     CASE 
-                        WHEN COUNT(CASE WHEN gender = 'Female' THEN 1 END) > 0 
-                        THEN CEIL(COUNT(CASE WHEN gender = 'Male' THEN 1 END) * 1.0 / 
-                                  COUNT(CASE WHEN gender = 'Female' THEN 1 END))
+                        WHEN SUM(CASE WHEN gender = 'Female' THEN candidate_count ELSE 0 END) > 0 
+                        THEN CEIL(SUM(CASE WHEN gender = 'Male' THEN candidate_count ELSE 0 END) * 1.0 / 
+                                  SUM(CASE WHEN gender = 'Female' THEN candidate_count ELSE 0 END))
                         ELSE 0
                     END as diversity_ratio
-                FROM candidates
+                FROM candidate_rollup
             '''
-            if company:
-                query += f" WHERE company = '{company}'"
+            where, params = self._rollup_filter(company, start_date, end_date)
+            query += where
             query += '''
                 GROUP BY company
                 ORDER BY company
             '''
-            return pd.read_sql(query, conn)
+            return pd.read_sql(query, conn, params=params)
+
+
+STATUS_COLUMNS = {
+    'Selected': 'selected',
+    'Rejected': 'rejected',
+    'Declined by Candidate': 'declined_by_candidate',
+    'Declined by Panel': 'declined_by_panel',
+}
+
+
+def _ceil_ratio(numerator, denominator):
+    """Vectorized CEIL(numerator / denominator), 0 where the denominator is 0."""
+    numerator = numerator.to_numpy(dtype=float)
+    denominator = denominator.to_numpy(dtype=float)
+    safe = np.where(denominator > 0, denominator, 1)
+    return np.where(denominator > 0, np.ceil(numerator / safe), 0)
+
+
+def _plain_keys(frame, keys):
+    """Turn categorical group keys back into plain object columns for display."""
+    for key in keys:
+        frame[key] = frame[key].astype(object)
+    return frame
+
+
+def compute_dashboard_metrics(rollup, company=None):
+    """
+    Compute client, role and company aggregates plus ratio labels in one vectorized pass
+    over the categorical rollup frame. Output columns match get_client_data,
+    get_role_summary and get_company_metrics; `totals` holds the headline numbers.
+    """
+    counts = rollup['candidate_count']
+    weighted = rollup[['company', 'job_role', 'gender']].copy()
+    for status, column in STATUS_COLUMNS.items():
+        weighted[column] = counts.where(rollup['status'] == status, 0)
+    weighted['total'] = counts
+    weighted['male'] = counts.where(rollup['gender'] == 'Male', 0)
+    weighted['female'] = counts.where(rollup['gender'] == 'Female', 0)
+    weighted['selected_male'] = weighted['male'].where(rollup['status'] == 'Selected', 0)
+    weighted['selected_female'] = weighted['female'].where(rollup['status'] == 'Selected', 0)
+
+    groups = weighted.groupby(['company', 'job_role', 'gender'], observed=True, dropna=False, sort=True).sum()
+
+    role_summary = groups.groupby(level=['job_role', 'gender'], observed=True, dropna=False)[['selected', 'total']].sum()
+    role_summary['selection_rate'] = (role_summary['selected'] * 100.0 / role_summary['total']).round(1)
+    role_summary = _plain_keys(role_summary.reset_index(), ['job_role', 'gender'])
+
+    if company:
+        groups = groups[groups.index.get_level_values('company') == company]
+
+    client_data = groups[list(STATUS_COLUMNS.values()) + ['total']].reset_index()
+    client_data = _plain_keys(client_data, ['company', 'job_role', 'gender'])
+
+    per_company = groups.groupby(level='company', observed=True, dropna=False).sum()
+    company_metrics = pd.DataFrame({
+        'total_candidates': per_company['total'],
+        'selected_count': per_company['selected'],
+        'rejected_count': per_company['rejected'],
+        'declined_by_candidate': per_company['declined_by_candidate'],
+        'declined_by_panel': per_company['declined_by_panel'],
+        'selection_rate': (per_company['selected'] * 100.0 / per_company['total']).round(1),
+        'rejection_rate': (per_company['rejected'] * 100.0 / per_company['total']).round(1),
+        'male_count': per_company['male'],
+        'female_count': per_company['female'],
+        'selected_male': per_company['selected_male'],
+        'selected_female': per_company['selected_female'],
+        'selection_ratio': _ceil_ratio(per_company['total'], per_company['selected']),
+        'selection_diversity_ratio': _ceil_ratio(per_company['selected_male'], per_company['selected_female']),
+        'diversity_ratio': _ceil_ratio(per_company['male'], per_company['female']),
+    })
+    company_metrics['gender_ratio'] = np.where(
+        company_metrics['female_count'] > 0,
+        company_metrics['diversity_ratio'].astype(int).astype(str) + ':1',
+        'N/A',
+    )
+    company_metrics = _plain_keys(company_metrics.reset_index(), ['company'])
+
+    overall = per_company.sum()
+    total_candidates = int(overall.get('total', 0))
+    totals = {
+        'total_candidates': total_candidates,
+        'total_selected': int(overall.get('selected', 0)),
+        'total_rejected': int(overall.get('rejected', 0)),
+        'declined_by_candidate': int(overall.get('declined_by_candidate', 0)),
+        'declined_by_panel': int(overall.get('declined_by_panel', 0)),
+        'total_male': int(overall.get('male', 0)),
+        'total_female': int(overall.get('female', 0)),
+        'selected_male': int(overall.get('selected_male', 0)),
+        'selected_female': int(overall.get('selected_female', 0)),
+    }
+    for name, count in (('selection_rate', 'total_selected'), ('rejection_rate', 'total_rejected'),
+                        ('male_share', 'total_male'), ('female_share', 'total_female')):
+        totals[name] = totals[count] / total_candidates * 100 if total_candidates > 0 else 0
+
+    return {
+        'client_data': client_data,
+        'role_summary': role_summary,
+        'company_metrics': company_metrics,
+        'totals': totals,
+    }
 
 
 def calculate_gender_ratio(male_count, female_count):
@@ -161,62 +675,142 @@ def display_ratio_details(total_candidates, selected_candidates, male_count, fem
 
 
 
+# Set ANALYTICS_NATIVE_CHARTS=1 to default the dashboard to Streamlit's built-in charts,
+# which skip Matplotlib rasterization entirely.
+NATIVE_CHARTS_DEFAULT = os.getenv("ANALYTICS_NATIVE_CHARTS", "0") == "1"
+
+
+def _figure_png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', bbox_inches='tight')
+    return buffer.getvalue()
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def render_bar_chart(data, x, y, color, title, figsize=(8, 6), rotate_labels=False):
+    """Render a bar chart to PNG bytes. Cached on the aggregate data and styling."""
+    fig, ax = plt.subplots(figsize=figsize)
+    try:
+        data.plot(x=x, y=y, kind='bar', ax=ax,
+                  color=color if isinstance(color, str) else list(color), title=title)
+        if rotate_labels:
+            ax.tick_params(axis='x', labelrotation=45)
+        return _figure_png(fig)
+    finally:
+        plt.close(fig)
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def render_pie_chart(sizes, labels, colors, title):
+    """Render a pie chart to PNG bytes. Cached on the slice sizes and styling."""
+    fig, ax = plt.subplots()
+    try:
+        ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90, colors=list(colors))
+        ax.set_title(title)
+        return _figure_png(fig)
+    finally:
+        plt.close(fig)
+
+
+def show_bar_chart(data, x, y, color, title, figsize=(8, 6), rotate_labels=False, native=False):
+    if native:
+        st.caption(title)
+        st.bar_chart(data, x=x, y=y, color=color if isinstance(color, str) else None)
+    else:
+        st.image(render_bar_chart(data, x, y, color, title, figsize, rotate_labels))
+
+
+def show_pie_chart(sizes, labels, colors, title, native=False):
+    if native:
+        # Streamlit has no native pie chart; a bar of the same shares is the light-weight stand-in.
+        st.caption(title)
+        st.bar_chart(pd.DataFrame({'share': sizes}, index=list(labels)))
+    else:
+        st.image(render_pie_chart(tuple(sizes), tuple(labels), tuple(colors), title))
+
+
+def render_candidate_detail(analyzer, company, job_roles):
+    """Show candidate rows one keyset page at a time, filtered in SQL by role and date range."""
+    st.markdown("**Candidate Records**")
+    filter_cols = st.columns(2)
+    job_role = filter_cols[0].selectbox("Role", options=['All Roles'] + job_roles, key="detail_role")
+    date_range = filter_cols[1].date_input("Interview Date Range", value=(), key="detail_dates",
+                                           help="Candidates without an interview date are listed first "
+                                                "and left out when a range is set.")
+    start_date, end_date = (tuple(date_range) + (None, None))[:2]
+    job_role = None if job_role == 'All Roles' else job_role
+
+    # Cursors of the pages visited so far; reset whenever the filters change.
+    filters = (company, job_role, start_date, end_date)
+    if st.session_state.get("detail_filters") != filters:
+        st.session_state["detail_filters"] = filters
+        st.session_state["detail_cursors"] = [None]
+    cursors = st.session_state["detail_cursors"]
+
+    page = analyzer.get_candidate_page(company, job_role, start_date, end_date, after=cursors[-1])
+    st.dataframe(page, hide_index=True)
+
+    nav_cols = st.columns(3)
+    nav_cols[1].write(f"Page {len(cursors)}")
+    if nav_cols[0].button("Previous", disabled=len(cursors) == 1, key="detail_prev"):
+        cursors.pop()
+        st.rerun()
+    if nav_cols[2].button("Next", disabled=len(page) < DETAIL_PAGE_SIZE, key="detail_next"):
+        last = page.iloc[-1]
+        cursors.append((last['interview_date'], int(last['id'])))
+        st.rerun()
+
+
+@st.cache_resource
+def get_analyzer(db_name='candidate_analysis.db'):
+    """Keep one analyzer (and its connection) alive across Streamlit reruns."""
+    return CandidateAnalyzer(db_name)
+
+
 def main():
     st.set_page_config(page_title="Client Candidate Analysis", layout="wide")
-    analyzer = CandidateAnalyzer()
+    analyzer = get_analyzer()
     st.title("👔 Client Candidate Analysis Dashboard")
     st.markdown("View role-wise and gender-wise selection metrics for your candidates")
 
     # Sidebar for client filter
     with st.sidebar:
         st.header("Client Filter")
-        company_data = analyzer.get_client_data()
+        all_metrics = analyzer.get_dashboard_metrics()
         selected_company = st.selectbox(
             "Select Client Company",
-            options=['All Clients'] + sorted(company_data['company'].unique().tolist()))
+            options=['All Clients'] + sorted(all_metrics['company_metrics']['company'].dropna().tolist()),
+            key="client_company")
+        native_charts = st.checkbox("Lightweight native charts", value=NATIVE_CHARTS_DEFAULT)
         if st.button("Generate Sample Data (50 candidates)"):
             analyzer.generate_fake_data()
             st.success("Generated 50 sample candidate records!")
 
-    # Fetch data based on selection
+    # Fetch data based on selection; one pass yields every aggregate on the page
     if selected_company == 'All Clients':
-        client_data = analyzer.get_client_data()
-        company_metrics = analyzer.get_company_metrics()
-
-        # Aggregate metrics across all clients
-        total_candidates = company_metrics['total_candidates'].sum()
-        total_selected = company_metrics['selected_count'].sum()
-        total_rejected = company_metrics['rejected_count'].sum()
-        total_male = company_metrics['male_count'].sum()
-        total_female = company_metrics['female_count'].sum()
-        selected_male = company_metrics['selected_male'].sum()
-        selected_female = company_metrics['selected_female'].sum()
-
-        overall_selection_rate = (total_selected / total_candidates * 100) if total_candidates > 0 else 0
-        overall_rejection_rate = (total_rejected / total_candidates * 100) if total_candidates > 0 else 0
+        metrics = analyzer.get_dashboard_metrics()
     else:
-        client_data = analyzer.get_client_data(selected_company)
-        company_metrics = analyzer.get_company_metrics(selected_company)
-
-        if not company_metrics.empty:
-            row = company_metrics.iloc[0]
-            total_candidates = row['total_candidates']
-            total_selected = row['selected_count']
-            total_rejected = row['rejected_count']
-            total_male = row['male_count']
-            total_female = row['female_count']
-            selected_male = row['selected_male']
-            selected_female = row['selected_female']
-
-            overall_selection_rate = row['selection_rate']
-            overall_rejection_rate = row['rejection_rate']
+        metrics = analyzer.get_dashboard_metrics(selected_company)
+    client_data = metrics['client_data']
+    company_metrics = metrics['company_metrics']
+    totals = metrics['totals']
+
+    total_candidates = totals['total_candidates']
+    total_selected = totals['total_selected']
+    total_rejected = totals['total_rejected']
+    total_male = totals['total_male']
+    total_female = totals['total_female']
+    selected_male = totals['selected_male']
+    selected_female = totals['selected_female']
+    overall_selection_rate = totals['selection_rate']
+    overall_rejection_rate = totals['rejection_rate']
 
     # Display ratio details
     display_ratio_details(total_candidates, total_selected, total_male, total_female, selected_male, selected_female)
 
     # Role-wise summary section
     st.subheader("Role-wise Selection Summary")
-    role_summary = analyzer.get_role_summary()
+    role_summary = metrics['role_summary']
     if not role_summary.empty:
         pivot_table = role_summary.pivot_table(
             index='job_role',
@@ -235,8 +829,8 @@ def main():
         cols[2].metric("Rejected", f"{total_rejected} ({overall_rejection_rate:.1f}%)")
 
         gender_cols = st.columns(2)
-        gender_cols[0].metric("Male Candidates", f"{(total_male / total_candidates * 100):.1f}%" if total_candidates > 0 else "N/A")
-        gender_cols[1].metric("Female Candidates", f"{(total_female / total_candidates * 100):.1f}%" if total_candidates > 0 else "N/A")
+        gender_cols[0].metric("Male Candidates", f"{totals['male_share']:.1f}%" if total_candidates > 0 else "N/A")
+        gender_cols[1].metric("Female Candidates", f"{totals['female_share']:.1f}%" if total_candidates > 0 else "N/A")
 
     # Client-specific data section
     st.subheader(f"Client-wise Analysis: {selected_company if selected_company != 'All Clients' else 'All Clients'}")
@@ -244,97 +838,49 @@ def main():
         # Selection Metrics
         sel_col1, sel_col2 = st.columns(2)
         with sel_col1:
-            fig1, ax1 = plt.subplots(figsize=(10, 6))
             selection_by_role = client_data.groupby('job_role')['selected'].sum().reset_index()
-            selection_by_role.plot(
-                x='job_role',
-                y='selected',
-                kind='bar',
-                ax=ax1,
-                color='green',
-                title=f"Selected Candidates by Role ({selected_company})"
-            )
-            plt.xticks(rotation=45)
-            st.pyplot(fig1)
+            show_bar_chart(selection_by_role, 'job_role', 'selected', 'green',
+                           f"Selected Candidates by Role ({selected_company})",
+                           figsize=(10, 6), rotate_labels=True, native=native_charts)
 
         with sel_col2:
-            fig2, ax2 = plt.subplots(figsize=(8, 6))
             selection_by_gender = client_data.groupby('gender')['selected'].sum().reset_index()
-            selection_by_gender.plot(
-                x='gender',
-                y='selected',
-                kind='bar',
-                ax=ax2,
-                color=['blue', 'pink'],
-                title=f"Selected Candidates by Gender ({selected_company})"
-            )
-            st.pyplot(fig2)
+            show_bar_chart(selection_by_gender, 'gender', 'selected', ('blue', 'pink'),
+                           f"Selected Candidates by Gender ({selected_company})",
+                           figsize=(8, 6), native=native_charts)
 
         # Rejection Metrics
         rej_col1, rej_col2 = st.columns(2)
         with rej_col1:
-            fig3, ax3 = plt.subplots(figsize=(10, 6))
             rejection_by_role = client_data.groupby('job_role')['rejected'].sum().reset_index()
-            rejection_by_role.plot(
-                x='job_role',
-                y='rejected',
-                kind='bar',
-                ax=ax3,
-                color='red',
-                title=f"Rejected Candidates by Role ({selected_company})"
-            )
-            plt.xticks(rotation=45)
-            st.pyplot(fig3)
+            show_bar_chart(rejection_by_role, 'job_role', 'rejected', 'red',
+                           f"Rejected Candidates by Role ({selected_company})",
+                           figsize=(10, 6), rotate_labels=True, native=native_charts)
 
         with rej_col2:
-            fig4, ax4 = plt.subplots(figsize=(8, 6))
             rejection_by_gender = client_data.groupby('gender')['rejected'].sum().reset_index()
-            rejection_by_gender.plot(
-                x='gender',
-                y='rejected',
-                kind='bar',
-                ax=ax4,
-                color=['blue', 'pink'],
-                title=f"Rejected Candidates by Gender ({selected_company})"
-            )
-            st.pyplot(fig4)
+            show_bar_chart(rejection_by_gender, 'gender', 'rejected', ('blue', 'pink'),
+                           f"Rejected Candidates by Gender ({selected_company})",
+                           figsize=(8, 6), native=native_charts)
 
         # Distribution Overview (Pie Charts)
         pie_col1, pie_col2 = st.columns(2)
         with pie_col1:
-            if selected_company == 'All Clients':
-                status_data = company_metrics[['selected_count', 'rejected_count',
-                                               'declined_by_candidate', 'declined_by_panel']].sum()
-            else:
-                status_data = company_metrics.iloc[0][['selected_count', 'rejected_count',
-                                                       'declined_by_candidate', 'declined_by_panel']]
-            fig5, ax5 = plt.subplots()
-            labels = ['Selected', 'Rejected', 'Declined by Candidate', 'Declined by Panel']
-            sizes = status_data.values
-            ax5.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90,
-                   colors=['green', 'red', 'orange', 'yellow'])
-            ax5.set_title('Candidate Status Distribution')
-            st.pyplot(fig5)
+            sizes = tuple(totals[key] for key in ('total_selected', 'total_rejected',
+                                                  'declined_by_candidate', 'declined_by_panel'))
+            labels = ('Selected', 'Rejected', 'Declined by Candidate', 'Declined by Panel')
+            show_pie_chart(sizes, labels, ('green', 'red', 'orange', 'yellow'),
+                           'Candidate Status Distribution', native=native_charts)
 
         with pie_col2:
-            if selected_company == 'All Clients':
-                male_perc = (company_metrics['male_count'].sum() / company_metrics['total_candidates'].sum()) * 100
-                female_perc = (company_metrics['female_count'].sum() / company_metrics['total_candidates'].sum()) * 100
-            else:
-                male_perc = (company_metrics.iloc[0]['male_count'] / company_metrics.iloc[0]['total_candidates']) * 100
-                female_perc = (company_metrics.iloc[0]['female_count'] / company_metrics.iloc[0]['total_candidates']) * 100
-            fig6, ax6 = plt.subplots()
-            labels = ['Male', 'Female']
-            sizes = [male_perc, female_perc]
-            ax6.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90,
-                   colors=['lightblue', 'lightpink'])
-            ax6.set_title('Gender Distribution')
-            st.pyplot(fig6)
+            sizes = (totals['male_share'], totals['female_share'])
+            show_pie_chart(sizes, ('Male', 'Female'), ('lightblue', 'lightpink'),
+                           'Gender Distribution', native=native_charts)
 
         # Detailed Metrics
         st.subheader("Detailed Company Metrics")
         if selected_company == 'All Clients':
-            for _, row in company_metrics.iterrows():
+            for row in company_metrics.to_dict('records'):
                 with st.expander(f"Metrics for {row['company']}"):
                     cols = st.columns(4)
                     cols[0].metric("Total Candidates", row['total_candidates'])
@@ -350,7 +896,7 @@ def main():
                     ratio_cols[0].metric("Selection Ratio", f"1:{int(row['selection_ratio'])}")
                     ratio_cols[1].metric("Selection Diversity Ratio",
                                         f"{int(row['selection_diversity_ratio'])}:1" if row['selection_diversity_ratio'] > 0 else "N/A")
-                    ratio_cols[2].metric("Gender Ratio", f"{int(row['diversity_ratio'])}:1")
+                    ratio_cols[2].metric("Gender Ratio", row['gender_ratio'])
         else:
             if not company_metrics.empty:
                 row = company_metrics.iloc[0]
@@ -368,7 +914,7 @@ def main():
                 ratio_cols[0].metric("Selection Ratio", f"1:{int(row['selection_ratio'])}")
                 ratio_cols[1].metric("Selection Diversity Ratio",
                                     f"{int(row['selection_diversity_ratio'])}:1" if row['selection_diversity_ratio'] > 0 else "N/A")
-                ratio_cols[2].metric("Gender Ratio", f"{int(row['diversity_ratio'])}:1")
+                ratio_cols[2].metric("Gender Ratio", row['gender_ratio'])
 
         # Raw data table (optional - can be commented out if not needed)
         with st.expander("View Detailed Candidate Data"):
@@ -379,6 +925,8 @@ def main():
                 'declined_by_panel': '{:.0f}',
                 'total': '{:.0f}'
             }))
+            render_candidate_detail(analyzer, None if selected_company == 'All Clients' else selected_company,
+                                    sorted(client_data['job_role'].dropna().unique().tolist()))
     else:
         st.warning("No data available for the selected client")
 
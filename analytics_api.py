@@ -0,0 +1,128 @@
+import argparse
+import hashlib
+import json
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from analytics import CandidateAnalyzer
+
+# Endpoint path -> analyzer method. Every method accepts company, start_date and end_date.
+ENDPOINTS = {
+    '/client-data': 'get_client_data',
+    '/role-summary': 'get_role_summary',
+    '/company-metrics': 'get_company_metrics',
+}
+FILTERS = ('company', 'start_date', 'end_date')
+
+
+class VersionClock:
+    """Remember when the analyzer's data version last changed, for Last-Modified headers."""
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._version = None
+        self._modified_at = self.started_at
+
+    def current(self):
+        version = self.analyzer.data_version()
+        with self._lock:
+            if version != self._version:
+                if self._version is not None:
+                    self._modified_at = time.time()
+                self._version = version
+            return version, self._modified_at
+
+
+def make_handler(analyzer):
+    clock = VersionClock(analyzer)
+
+    class AnalyticsHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out in separate writes; without this, keep-alive clients
+        # stall on delayed ACKs for ~40ms per response.
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            method = ENDPOINTS.get(url.path)
+            if method is None:
+                return self._send_json(404, {'error': f"Unknown endpoint {url.path}",
+                                             'endpoints': sorted(ENDPOINTS)})
+            query = parse_qs(url.query)
+            filters = {name: query[name][0] for name in FILTERS if query.get(name)}
+
+            version, modified_at = clock.current()
+            # Data versions restart with the process, so the start time keeps ETags unique.
+            etag = '"' + hashlib.sha1(
+                repr((clock.started_at, version, url.path, sorted(filters.items()))).encode()
+            ).hexdigest() + '"'
+            headers = {
+                'ETag': etag,
+                'Last-Modified': formatdate(modified_at, usegmt=True),
+                'Cache-Control': 'no-cache',
+            }
+            if self._not_modified(etag, modified_at):
+                return self._send(304, b'', headers)
+
+            frame = getattr(analyzer, method)(**filters)
+            body = frame.to_json(orient='records').encode()
+            self._send(200, body, dict(headers, **{'Content-Type': 'application/json'}))
+
+        def _not_modified(self, etag, modified_at):
+            if_none_match = self.headers.get('If-None-Match')
+            if if_none_match is not None:
+                return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+            if_modified_since = self.headers.get('If-Modified-Since')
+            if if_modified_since:
+                try:
+                    return int(modified_at) <= parsedate_to_datetime(if_modified_since).timestamp()
+                except (TypeError, ValueError):
+                    return False
+            return False
+
+        def _send_json(self, status, payload):
+            self._send(status, json.dumps(payload).encode(), {'Content-Type': 'application/json'})
+
+        def _send(self, status, body, headers):
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return AnalyticsHandler
+
+
+def create_server(host='127.0.0.1', port=8502, db_name='candidate_analysis.db'):
+    # A read-only API must not fill an empty or mistyped database with demo rows
+    return ThreadingHTTPServer((host, port), make_handler(CandidateAnalyzer(db_name, seed_if_empty=False)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve candidate analytics as JSON over HTTP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--db', default='candidate_analysis.db')
+    args = parser.parse_args()
+    server = create_server(args.host, args.port, args.db)
+    print(f"Serving analytics API on http://{args.host}:{args.port} ({', '.join(sorted(ENDPOINTS))})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
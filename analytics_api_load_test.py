@@ -0,0 +1,82 @@
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlparse
+
+
+def worker(base_url, paths, requests_per_worker, revalidate, latencies, statuses, lock):
+    """Issue requests over one keep-alive connection, optionally revalidating with If-None-Match."""
+    url = urlparse(base_url)
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+    etags = {}
+    local_latencies = []
+    local_statuses = {}
+    try:
+        for i in range(requests_per_worker):
+            path = paths[i % len(paths)]
+            headers = {'If-None-Match': etags[path]} if revalidate and path in etags else {}
+            start = time.perf_counter()
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            local_latencies.append((time.perf_counter() - start) * 1000)
+            local_statuses[response.status] = local_statuses.get(response.status, 0) + 1
+            if response.getheader('ETag'):
+                etags[path] = response.getheader('ETag')
+    finally:
+        conn.close()
+    with lock:
+        latencies.extend(local_latencies)
+        for status, count in local_statuses.items():
+            statuses[status] = statuses.get(status, 0) + count
+
+
+def run_load_test(base_url, paths, concurrency, requests_per_worker, revalidate):
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=worker,
+                         args=(base_url, paths, requests_per_worker, revalidate, latencies, statuses, lock))
+        for _ in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'revalidate': revalidate,
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'requests_per_sec': round(len(latencies) / elapsed, 1) if elapsed else 0,
+        'p50_ms': round(latencies[len(latencies) // 2], 2) if latencies else None,
+        'p99_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 2) if latencies else None,
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the analytics JSON API.")
+    parser.add_argument('--url', default='http://127.0.0.1:8502')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=250, help="Requests per worker")
+    parser.add_argument('--company', help="Also exercise the company filter for this company")
+    args = parser.parse_args()
+
+    paths = ['/client-data', '/role-summary', '/company-metrics']
+    if args.company:
+        paths += [f'/client-data?company={args.company}', f'/company-metrics?company={args.company}']
+
+    results = [run_load_test(args.url, paths, args.concurrency, args.requests, revalidate)
+               for revalidate in (False, True)]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+import argparse
+import json
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from http_client import get_http_client
+from interviewer_feedback import (analyze_transcription_and_generate_feedback, download_video,
+                                  extract_drive_file_id, fetch_pending_candidates, generate_recommendation,
+                                  get_video_duration, initialize_database, release_video, save_feedback,
+                                  transcribe_video, video_content_hash)
+
+# Each stage has its own worker pool so network-bound downloads, long transcription polls
+# and LLM calls overlap across interviews. "save" writes to SQLite and stays single-threaded.
+STAGES = ("download", "transcribe", "analyze", "save")
+DEFAULT_WORKERS = {"download": 4, "transcribe": 4, "analyze": 2, "save": 1}
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else None
+
+
+class BatchRunner:
+    """Push every pending interview through the stage pools and collect the finished items."""
+
+    def __init__(self, workers=DEFAULT_WORKERS):
+        self.pools = {stage: ThreadPoolExecutor(max_workers=workers[stage], thread_name_prefix=f"batch-{stage}")
+                      for stage in STAGES}
+        self.finished = queue.Queue()
+
+    def run(self, candidates, on_finished=None):
+        for candidate in candidates:
+            self._submit(0, {"candidate": candidate, "timings": {}, "notes": [], "started": time.perf_counter()})
+        items = []
+        for _ in candidates:
+            item = self.finished.get()
+            items.append(item)
+            if on_finished:
+                on_finished(item, len(items), len(candidates))
+        for pool in self.pools.values():
+            pool.shutdown()
+        return items
+
+    def _submit(self, index, item):
+        self.pools[STAGES[index]].submit(self._run_stage, index, item)
+
+    def _run_stage(self, index, item):
+        stage = STAGES[index]
+        start = time.perf_counter()
+        try:
+            getattr(self, f"_{stage}")(item)
+        except Exception as e:
+            item["failed_stage"], item["error"] = stage, str(e) or type(e).__name__
+        item["timings"][stage] = time.perf_counter() - start
+        if "error" in item or index == len(STAGES) - 1:
+            if "video_path" in item:
+                release_video(item["video_path"])
+            item["total"] = time.perf_counter() - item["started"]
+            self.finished.put(item)
+        else:
+            self._submit(index + 1, item)
+
+    def _download(self, item):
+        item["video_path"] = download_video(item["candidate"]["VideoInterviewLink"])
+        item["video_duration"] = get_video_duration(item["video_path"], item["notes"].append)
+
+    def _transcribe(self, item):
+        item["transcription"] = transcribe_video(item["video_path"], item["notes"].append)
+
+    def _analyze(self, item):
+        item["categories"] = analyze_transcription_and_generate_feedback(
+            item["transcription"], item["video_duration"], on_note=item["notes"].append)
+        if not item["categories"]:
+            raise RuntimeError("Feedback generation returned no questions")
+
+    def _save(self, item):
+        candidate = item["candidate"]
+        analysis = {
+            "video_path": item["video_path"],
+            "video_file_id": extract_drive_file_id(candidate["VideoInterviewLink"]),
+            "video_hash": video_content_hash(item["video_path"]),
+            "video_duration": item["video_duration"],
+            "transcript_text": item["transcription"].text,
+            "categories": item["categories"],
+        }
+        all_qa_data = [qa for category in item["categories"] for qa in category["questions_and_answers"]]
+        item["average_score"], item["recommendation"], _, _ = generate_recommendation(all_qa_data)
+        save_feedback(candidate["Email"], candidate["InterviewDate"] or time.strftime("%Y-%m-%d"), analysis)
+
+
+def summarize(items, elapsed):
+    completed = [item for item in items if "error" not in item]
+    stages = {}
+    for stage in STAGES + ("total",):
+        timings = [item["timings"][stage] if stage != "total" else item["total"]
+                   for item in items if stage == "total" or stage in item["timings"]]
+        if timings:
+            stages[stage] = {
+                "count": len(timings),
+                "p50_s": round(percentile(timings, 0.5), 2),
+                "p90_s": round(percentile(timings, 0.9), 2),
+                "p99_s": round(percentile(timings, 0.99), 2),
+                "max_s": round(max(timings), 2),
+            }
+    return {
+        "interviews": len(items),
+        "completed": len(completed),
+        "failed": len(items) - len(completed),
+        "elapsed_s": round(elapsed, 1),
+        "interviews_per_hour": round(len(completed) / elapsed * 3600, 1) if elapsed else 0,
+        "stage_latency": stages,
+    }
+
+
+def print_progress(item, done, total):
+    email = item["candidate"]["Email"]
+    if "error" in item:
+        print(f"[{done}/{total}] {email}: failed during {item['failed_stage']}: {item['error']}")
+    else:
+        print(f"[{done}/{total}] {email}: {item['recommendation']} ({item['average_score']}/100) "
+              f"in {item['total']:.1f}s")
+    for note in item["notes"]:
+        print(f"    note: {note}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze every pending interview video without the Streamlit UI.")
+    for stage in STAGES:
+        parser.add_argument(f"--{stage}-workers", type=int, default=DEFAULT_WORKERS[stage])
+    parser.add_argument("--limit", type=int, help="Analyze at most this many pending interviews")
+    parser.add_argument("--output", help="Also write the summary JSON to this path")
+    args = parser.parse_args()
+
+    initialize_database()
+    candidates = fetch_pending_candidates(args.limit)
+    print(f"{len(candidates)} pending interview(s)")
+    if not candidates:
+        return
+
+    workers = {stage: getattr(args, f"{stage}_workers") for stage in STAGES}
+    start = time.perf_counter()
+    items = BatchRunner(workers).run(candidates, on_finished=print_progress)
+    summary = summarize(items, time.perf_counter() - start)
+    summary["workers"] = workers
+    summary["http"] = get_http_client().stats()
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(summary, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from analytics import DETAIL_INDEXES, CandidateAnalyzer, compute_dashboard_metrics
+
+DEFAULT_SIZES = (10_000, 1_000_000, 10_000_000)
+
+# Skewed like real hiring data: a few large clients dominate, most candidates interview
+# for engineering roles, and rejections outnumber every other outcome.
+COMPANIES = ['Amazon', 'Google', 'Salesforce', 'Adobe', 'Cred', 'Navi', 'Rupeek', 'Quince', 'Zee', 'Thoughtspot',
+             'Razorpay', 'Swiggy', 'Zomato', 'Flipkart', 'Meesho', 'Groww', 'Zerodha', 'Atlassian', 'Uber', 'Ola']
+COMPANY_WEIGHTS = [1 / rank ** 1.1 for rank in range(1, len(COMPANIES) + 1)]
+JOB_ROLES = ['SDE I', 'SDE II', 'SDE III', 'SDET I', 'SDET II', 'EM', 'Data Scientist', 'Product Manager']
+JOB_ROLE_WEIGHTS = [0.22, 0.24, 0.16, 0.1, 0.06, 0.05, 0.1, 0.07]
+GENDERS = ['Male', 'Female', 'Other']
+GENDER_WEIGHTS = [0.62, 0.36, 0.02]
+STATUSES = ['Selected', 'Rejected', 'Declined by Candidate', 'Declined by Panel']
+STATUS_WEIGHTS = [0.18, 0.55, 0.17, 0.1]
+HISTORY_DAYS = 3 * 365
+
+# Indexes the "without indexes" runs drop; they are recreated afterwards.
+BENCHMARK_INDEXES = ('idx_candidate_rollup_group', 'idx_candidates_date_key', 'idx_candidates_company_date_key',
+                     'idx_candidates_role_date_key', 'idx_candidates_company_role_date_key')
+
+
+def skewed_candidates(count, seed=42):
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=HISTORY_DAYS)
+    batch = 10_000
+    for offset in range(0, count, batch):
+        size = min(batch, count - offset)
+        companies = rng.choices(COMPANIES, COMPANY_WEIGHTS, k=size)
+        roles = rng.choices(JOB_ROLES, JOB_ROLE_WEIGHTS, k=size)
+        genders = rng.choices(GENDERS, GENDER_WEIGHTS, k=size)
+        statuses = rng.choices(STATUSES, STATUS_WEIGHTS, k=size)
+        for i in range(size):
+            # Hiring volume grows over time, so recent dates are denser.
+            day = int(HISTORY_DAYS * rng.random() ** 0.7)
+            yield (f"Candidate {offset + i}", genders[i], roles[i], statuses[i], companies[i],
+                   (start + timedelta(days=day)).isoformat())
+
+
+def seed_database(db_name, count):
+    start = time.perf_counter()
+    analyzer = CandidateAnalyzer(db_name, snapshot_dir=os.path.join(os.path.dirname(db_name), 'no_snapshot'),
+                                 seed_if_empty=False)
+    analyzer.add_candidates(skewed_candidates(count), chunk_size=50_000, rebuild_indexes=True)
+    return analyzer, time.perf_counter() - start
+
+
+def time_call(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {'min_ms': round(min(timings), 3), 'median_ms': round(statistics.median(timings), 3)}
+
+
+def peak_memory_mb(function):
+    """Peak Python-tracked allocation (pandas/numpy buffers included) while running `function`."""
+    tracemalloc.start()
+    try:
+        function()
+        return round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+    finally:
+        tracemalloc.stop()
+
+
+def query_suite(analyzer, companies):
+    """Uncached analyzer queries, so every call really hits SQLite."""
+    company = companies[0]
+    recent = (date.today() - timedelta(days=90)).isoformat()
+    return {
+        'get_client_data': lambda: analyzer._query_client_data(),
+        'get_client_data_company': lambda: analyzer._query_client_data(company),
+        'get_role_summary': lambda: analyzer._query_role_summary(),
+        'get_company_metrics': lambda: analyzer._query_company_metrics(),
+        'get_company_metrics_company': lambda: analyzer._query_company_metrics(company),
+        'dashboard_metrics': lambda: compute_dashboard_metrics(analyzer._query_rollup_frame()),
+        'candidate_page': lambda: analyzer.get_candidate_page(company, 'SDE II', start_date=recent),
+        'candidate_page_seek': lambda: analyzer.get_candidate_page(after=(recent, 0)),
+    }
+
+
+def drop_indexes(analyzer):
+    with analyzer._connection() as conn:
+        for name in BENCHMARK_INDEXES:
+            conn.execute(f'DROP INDEX IF EXISTS "{name}"')
+        conn.commit()
+
+
+def restore_indexes(analyzer):
+    with analyzer._connection() as conn:
+        conn.executescript(DETAIL_INDEXES)
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_candidate_rollup_group
+                ON candidate_rollup (company, job_role, gender, status, interview_date)
+        ''')
+        conn.commit()
+
+
+def time_main_render(workdir, analyzer):
+    """Time the Streamlit render path (cold and warm rerun) against the seeded database."""
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return None
+    analyzer.close()
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        app = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'analytics.py'),
+                                default_timeout=3600)
+        start = time.perf_counter()
+        app.run()
+        cold = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        app.run()
+        warm = (time.perf_counter() - start) * 1000
+        if app.exception:
+            return {'error': str(app.exception)}
+        return {'cold_ms': round(cold, 3), 'warm_ms': round(warm, 3)}
+    finally:
+        os.chdir(cwd)
+
+
+def benchmark_size(size, repeat, raw_read_limit):
+    workdir = tempfile.mkdtemp(prefix=f'analytics_bench_{size}_')
+    # main() opens candidate_analysis.db in the working directory, so seed that file.
+    db_name = os.path.join(workdir, 'candidate_analysis.db')
+    analyzer, seed_seconds = seed_database(db_name, size)
+    companies = analyzer._query_company_metrics().sort_values('total_candidates', ascending=False)['company'].tolist()
+
+    result = {
+        'rows': size,
+        'seed_seconds': round(seed_seconds, 2),
+        'db_size_mb': round(os.path.getsize(db_name) / (1024 * 1024), 2),
+        'queries': {},
+        'read_sql_peak_mb': {},
+    }
+    suite = query_suite(analyzer, companies)
+    for name, function in suite.items():
+        result['queries'][name] = {'indexed': time_call(function, repeat)}
+    drop_indexes(analyzer)
+    for name, function in suite.items():
+        result['queries'][name]['unindexed'] = time_call(function, repeat)
+    restore_indexes(analyzer)
+
+    result['read_sql_peak_mb']['rollup_frame'] = peak_memory_mb(analyzer._query_rollup_frame)
+    result['read_sql_peak_mb']['get_client_data'] = peak_memory_mb(analyzer._query_client_data)
+    if size <= raw_read_limit:
+        def read_all_candidates():
+            with analyzer._connection() as conn:
+                pd.read_sql('SELECT * FROM candidates', conn)
+        result['read_sql_peak_mb']['all_candidates'] = peak_memory_mb(read_all_candidates)
+
+    result['main_render'] = time_main_render(workdir, analyzer)
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analytics queries at production data scales.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--raw-read-limit', type=int, default=1_000_000,
+                        help="Largest size at which to measure reading the whole candidates table")
+    parser.add_argument('--output', default=None, help="JSON results path (default: benchmark_results_<rev>.json)")
+    args = parser.parse_args()
+
+    revision = git_revision()
+    report = {
+        'revision': revision,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'pandas': pd.__version__,
+        'results': [],
+    }
+    for size in args.sizes:
+        print(f"Benchmarking {size:,} rows...")
+        report['results'].append(benchmark_size(size, args.repeat, args.raw_read_limit))
+        print(json.dumps(report['results'][-1], indent=2))
+
+    output = args.output or f"benchmark_results_{revision or 'unknown'}.json"
+    with open(output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
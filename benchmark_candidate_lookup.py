@@ -0,0 +1,132 @@
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from interviewer_feedback import fetch_candidate_details, initialize_database, search_candidates
+
+FIRST_NAMES = ['Aarav', 'Aditi', 'Akash', 'Ananya', 'Arjun', 'Divya', 'Ishaan', 'Kavya', 'Meera', 'Nikhil',
+               'Priya', 'Rahul', 'Riya', 'Rohan', 'Saanvi', 'Shivang', 'Sneha', 'Tanvi', 'Varun', 'Vikram',
+               'James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda', 'David', 'Sarah',
+               'Daniel', 'Emily', 'Matthew', 'Olivia', 'Andrew', 'Sophia', 'Joshua', 'Grace', 'Ethan', 'Chloe']
+LAST_NAMES = ['Sharma', 'Verma', 'Gupta', 'Rustagi', 'Iyer', 'Reddy', 'Nair', 'Mehta', 'Kapoor', 'Joshi',
+              'Patel', 'Singh', 'Kumar', 'Bose', 'Chopra', 'Desai', 'Malhotra', 'Agarwal', 'Banerjee', 'Pillai',
+              'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Wilson', 'Taylor',
+              'Anderson', 'Thomas', 'Moore', 'Martin', 'Jackson', 'White', 'Harris', 'Clark', 'Lewis', 'Walker']
+DOMAINS = ['gmail.com', 'outlook.com', 'yahoo.com', 'example.com']
+# Per-lookup latency goal; lookups whose median exceeds it are listed under 'over_target'
+TARGET_MS = 1.0
+
+
+def roster(count, seed=42):
+    rng = random.Random(seed)
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        # Most names repeat across a large roster; the numeric suffix keeps emails unique.
+        name = f"{first} {last}" if rng.random() < 0.9 else f"{first} {last} {i}"
+        yield (name, f"{first.lower()}.{last.lower()}{i}@{rng.choice(DOMAINS)}", '2024-01-15', 'SDE I',
+               f"https://drive.google.com/file/d/{i:012d}/view")
+
+
+def seed_database(db_path, count):
+    """Bulk-load the legacy schema (no search indexes) so the old lookup can be timed first."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+    CREATE TABLE candidates (
+        Name TEXT NOT NULL,
+        Email TEXT PRIMARY KEY,
+        InterviewDate TEXT,
+        AppliedRole TEXT,
+        VideoInterviewLink TEXT
+    )""")
+    conn.executemany("INSERT INTO candidates VALUES (?, ?, ?, ?, ?)", roster(count))
+    conn.commit()
+    sample = conn.execute("SELECT Name, Email FROM candidates WHERE rowid = ?", (count // 2,)).fetchone()
+    conn.close()
+    return sample
+
+
+def time_call(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {'min_ms': round(min(timings), 3), 'median_ms': round(statistics.median(timings), 3)}
+
+
+def legacy_lookup(db_path, identifier):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("""
+        SELECT Name, Email, InterviewDate, AppliedRole, VideoInterviewLink
+        FROM candidates WHERE Email = ? OR Name = ?
+        """, (identifier, identifier)).fetchone()
+    finally:
+        conn.close()
+
+
+def benchmark_size(size, repeat):
+    db_path = os.path.join(tempfile.mkdtemp(prefix=f'candidate_lookup_{size}_'), 'candidate_database.db')
+    start = time.perf_counter()
+    name, email = seed_database(db_path, size)
+    seed_seconds = time.perf_counter() - start
+
+    result = {'rows': size, 'seed_seconds': round(seed_seconds, 2), 'legacy': {}, 'indexed': {}}
+    result['legacy']['exact_email'] = time_call(lambda: legacy_lookup(db_path, email), repeat)
+    result['legacy']['exact_name'] = time_call(lambda: legacy_lookup(db_path, name), repeat)
+
+    start = time.perf_counter()
+    initialize_database(db_path)
+    result['index_build_seconds'] = round(time.perf_counter() - start, 2)
+    result['db_size_mb'] = round(os.path.getsize(db_path) / (1024 * 1024), 2)
+
+    first, last = name.split()[:2]
+    typo = first[:-2] + first[-1] + first[-2] + ' ' + last  # swap two letters
+    lookups = {
+        'exact_email': lambda: fetch_candidate_details(email, db_path=db_path),
+        'exact_name': lambda: fetch_candidate_details(name.upper(), db_path=db_path),
+        'email_prefix': lambda: search_candidates(email[:len(email) // 2], db_path=db_path),
+        'name_prefix': lambda: search_candidates(f"{first} {last[:3]}", db_path=db_path),
+        'reordered_name_prefix': lambda: search_candidates(f"{last} {first[:2]}", db_path=db_path),
+        'single_letter_prefix': lambda: search_candidates(first[0], db_path=db_path),
+        'fuzzy_name': lambda: search_candidates(typo, db_path=db_path),
+        # No name shares a trigram with 'zzqx', so only the any-word fallback can answer
+        'fuzzy_any_word': lambda: search_candidates(f"Zzqx {last}", db_path=db_path),
+    }
+    for label, function in lookups.items():
+        result['indexed'][label] = time_call(function, repeat)
+    result['target_ms'] = TARGET_MS
+    result['over_target'] = [label for label, timing in result['indexed'].items() if timing['median_ms'] > TARGET_MS]
+    result['fuzzy_top_match'] = (search_candidates(typo, limit=1, db_path=db_path) or [{}])[0].get('Name')
+    assert (result['fuzzy_top_match'] or '').split()[:2] == [first, last], \
+        f"fuzzy search for {typo!r} returned {result['fuzzy_top_match']!r}, expected {first} {last}"
+    fallback = search_candidates(f"Zzqx {last}", db_path=db_path)
+    assert fallback and all(last.lower() in match['Name'].lower() for match in fallback), \
+        f"any-word fallback for 'Zzqx {last}' returned {[match['Name'] for match in fallback]}"
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark candidate lookup and search against a large roster.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000_000])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', default=None, help="Optional JSON results path")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        print(f"Benchmarking {size:,} candidates...")
+        results.append(benchmark_size(size, args.repeat))
+        print(json.dumps(results[-1], indent=2))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'sqlite': sqlite3.sqlite_version, 'results': results}, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "analytics.py")
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB (Linux /proc, falling back to peak RSS)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(native, reruns):
+    """Rerun the dashboard `reruns` times, cycling through the client filter like a user would."""
+    os.environ["ANALYTICS_NATIVE_CHARTS"] = "1" if native else "0"
+    app = AppTest.from_file(APP_PATH, default_timeout=120)
+    app.run()
+    companies = app.selectbox(key="client_company").options
+
+    timings = []
+    rss_start = current_rss_mb()
+    for i in range(reruns):
+        start = time.perf_counter()
+        app.selectbox(key="client_company").select(companies[i % len(companies)]).run()
+        timings.append((time.perf_counter() - start) * 1000)
+        if app.exception:
+            raise RuntimeError(f"Dashboard raised during rerun {i}: {app.exception}")
+    rss_end = current_rss_mb()
+
+    timings.sort()
+    return {
+        "mode": "native" if native else "cached_image",
+        "reruns": reruns,
+        "mean_ms": round(statistics.mean(timings), 2),
+        "p50_ms": round(timings[len(timings) // 2], 2),
+        "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))], 2),
+        "rss_start_mb": round(rss_start, 1),
+        "rss_end_mb": round(rss_end, 1),
+        "rss_growth_mb": round(rss_end - rss_start, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analytics dashboard chart rendering across reruns.")
+    parser.add_argument("--reruns", type=int, default=500)
+    parser.add_argument("--output", help="Optional path to write the JSON results to")
+    args = parser.parse_args()
+
+    # Run against a throwaway database so the benchmark never touches real data.
+    os.chdir(tempfile.mkdtemp(prefix="analytics_bench_"))
+    results = [run_mode(False, args.reruns), run_mode(True, args.reruns)]
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
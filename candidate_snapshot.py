@@ -0,0 +1,196 @@
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:  # pyarrow is only needed for snapshots; the dashboard works without it
+    pa = None
+    ipc = None
+
+MANIFEST_FILE = 'manifest.json'
+ROLLUP_FILE = 'rollup.arrow'
+CANDIDATES_DIR = 'candidates'
+# Everything the exporter writes; a rebuild removes only these, never anything else in the directory
+SNAPSHOT_ENTRIES = (MANIFEST_FILE, ROLLUP_FILE, ROLLUP_FILE + '.tmp', CANDIDATES_DIR)
+CANDIDATE_COLUMNS = ('id', 'name', 'gender', 'job_role', 'status', 'company', 'interview_date')
+ROLLUP_COLUMNS = ('company', 'job_role', 'gender', 'status', 'interview_date', 'candidate_count')
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("pyarrow is required for candidate snapshots. Install it with `pip install pyarrow`.")
+
+
+def snapshot_dir_for(db_name):
+    """Default snapshot directory for a database: 'data/candidates.db' -> 'data/candidates_snapshot'."""
+    return os.path.splitext(db_name)[0] + '_snapshot'
+
+
+def read_manifest(snapshot_dir):
+    path = os.path.join(snapshot_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        return json.load(file)
+
+
+def read_change_counters(conn):
+    """
+    The candidates table's change token: the database's random id and absolute path plus
+    the insert/edit counters kept by triggers, or None on databases without them. The
+    identity keeps a snapshot from being served for, or appended to by, another database.
+    """
+    try:
+        row = conn.execute('SELECT db_id, inserts, edits FROM candidate_changes WHERE id = 1').fetchone()
+    except sqlite3.OperationalError:
+        return None
+    if row is None:
+        return None
+    db_path = next((path for _, name, path in conn.execute('PRAGMA database_list') if name == 'main'), '')
+    return {'db_id': row[0], 'db_path': os.path.realpath(db_path) if db_path else '',
+            'inserts': row[1], 'edits': row[2]}
+
+
+def _clear_snapshot(snapshot_dir):
+    """
+    Remove the exporter's own files from snapshot_dir. A non-empty directory holding
+    anything else and no manifest is not a snapshot, so it is refused rather than wiped.
+    """
+    if not os.path.isdir(snapshot_dir):
+        return
+    entries = set(os.listdir(snapshot_dir))
+    if MANIFEST_FILE not in entries and entries - set(SNAPSHOT_ENTRIES):
+        raise RuntimeError(f"{snapshot_dir!r} is not empty and holds no {MANIFEST_FILE}; "
+                           "choose an empty or dedicated directory for the snapshot.")
+    # The manifest goes first, so an interrupted rebuild is never mistaken for a complete snapshot
+    for name in SNAPSHOT_ENTRIES:
+        path = os.path.join(snapshot_dir, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+
+
+def _write_ipc(table, path, compression=None):
+    """Write an Arrow IPC file atomically so readers never map a half-written file."""
+    temp_path = path + '.tmp'
+    options = ipc.IpcWriteOptions(compression=compression)
+    with pa.OSFile(temp_path, 'wb') as sink:
+        with ipc.new_file(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+    os.replace(temp_path, path)
+
+
+def _rows_to_table(rows, columns):
+    return pa.table({column: [row[i] for row in rows] for i, column in enumerate(columns)})
+
+
+def refresh_snapshot(db_name='candidate_analysis.db', snapshot_dir=None, full=False):
+    """
+    Append candidates added since the last refresh as new interview_date partitions and
+    rewrite the rollup aggregates. `full` discards the snapshot and exports everything,
+    which also happens automatically once rows have been updated or deleted since the
+    last refresh (appending cannot express those) or when the snapshot was exported from
+    another database. `snapshot_dir` defaults to snapshot_dir_for(db_name).
+    Candidate partitions are zstd-compressed; the rollup is left uncompressed so the
+    dashboard can memory-map it without a decode step. Returns the new manifest.
+    """
+    _require_pyarrow()
+    snapshot_dir = snapshot_dir or snapshot_dir_for(db_name)
+    manifest = None if full else read_manifest(snapshot_dir)
+
+    conn = sqlite3.connect(db_name)
+    try:
+        # One read transaction, so the counters describe exactly the rows exported
+        conn.execute('BEGIN')
+        changes = read_change_counters(conn)
+        previous = (manifest or {}).get('changes') or {}
+        if manifest is not None and (changes is None or any(
+                previous.get(key) != changes[key] for key in ('db_id', 'db_path', 'edits'))):
+            manifest = None
+        if manifest is None:
+            _clear_snapshot(snapshot_dir)
+        os.makedirs(os.path.join(snapshot_dir, CANDIDATES_DIR), exist_ok=True)
+        last_id = manifest['max_id'] if manifest else 0
+
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT {", ".join(CANDIDATE_COLUMNS)} FROM candidates
+            WHERE id > ? ORDER BY interview_date, id
+        ''', (last_id,))
+        partitions = {}
+        max_id = last_id
+        for row in cursor:
+            partitions.setdefault(row[-1], []).append(row)
+            max_id = max(max_id, row[0])
+        cursor.execute(f'SELECT {", ".join(ROLLUP_COLUMNS)} FROM candidate_rollup')
+        rollup_rows = cursor.fetchall()
+    finally:
+        conn.close()
+
+    for interview_date, rows in partitions.items():
+        partition_dir = os.path.join(snapshot_dir, CANDIDATES_DIR, f'interview_date={interview_date}')
+        os.makedirs(partition_dir, exist_ok=True)
+        _write_ipc(_rows_to_table(rows, CANDIDATE_COLUMNS),
+                   os.path.join(partition_dir, f'part-{max_id:012d}.arrow'), compression='zstd')
+    _write_ipc(_rows_to_table(rollup_rows, ROLLUP_COLUMNS), os.path.join(snapshot_dir, ROLLUP_FILE))
+
+    manifest = {
+        'max_id': max_id,
+        'changes': changes,
+        'candidate_count': (manifest['candidate_count'] if manifest else 0) + sum(map(len, partitions.values())),
+        'partitions': sorted(set((manifest or {}).get('partitions', [])) | {str(d) for d in partitions}),
+    }
+    with open(os.path.join(snapshot_dir, MANIFEST_FILE), 'w') as file:
+        json.dump(manifest, file, indent=2)
+    return manifest
+
+
+def load_snapshot_rollup(snapshot_dir):
+    """Memory-map the rollup aggregates and return them as a DataFrame, or None if absent."""
+    path = os.path.join(snapshot_dir, ROLLUP_FILE)
+    if pa is None or not os.path.exists(path):
+        return None
+    with pa.memory_map(path) as source:
+        table = ipc.open_file(source).read_all()
+    return table.to_pandas()
+
+
+def load_snapshot_candidates(snapshot_dir, start_date=None, end_date=None):
+    """Read candidate partitions whose interview_date lies in [start_date, end_date] as one Arrow table."""
+    _require_pyarrow()
+    root = os.path.join(snapshot_dir, CANDIDATES_DIR)
+    tables = []
+    for partition in sorted(os.listdir(root)) if os.path.exists(root) else []:
+        interview_date = partition.split('=', 1)[1]
+        if (start_date and interview_date < str(start_date)) or (end_date and interview_date > str(end_date)):
+            continue
+        for part in sorted(os.listdir(os.path.join(root, partition))):
+            with pa.memory_map(os.path.join(root, partition, part)) as source:
+                tables.append(ipc.open_file(source).read_all())
+    if not tables:
+        return None
+    return pa.concat_tables(tables)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or refresh the columnar candidate snapshot.")
+    parser.add_argument('--db', default='candidate_analysis.db')
+    parser.add_argument('--snapshot-dir', help="Defaults to <db name>_snapshot next to the database")
+    parser.add_argument('--full', action='store_true', help="Rebuild the snapshot from scratch")
+    args = parser.parse_args()
+    args.snapshot_dir = args.snapshot_dir or snapshot_dir_for(args.db)
+    try:
+        manifest = refresh_snapshot(args.db, args.snapshot_dir, full=args.full)
+    except RuntimeError as e:
+        parser.error(str(e))
+    print(f"Snapshot at {args.snapshot_dir}: {manifest['candidate_count']} candidates, "
+          f"{len(manifest['partitions'])} partitions, up to id {manifest['max_id']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,9 +5,10 @@ from datetime import datetime, timedelta
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 import os
 
+from http_client import get_http_client
+
 # Initialize Faker
 fake = Faker()
 
@@ -66,26 +67,30 @@ time_slots = ['09:00-10:00', '10:00-11:00', '11:00-12:00', '13:00-14:00', '14:00
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 CREDENTIALS_FILE = 'credentials.json'
 TOKEN_FILE = 'token.json'
-
-def get_calendar_service():
-    """Authenticate and return Google Calendar service."""
-    creds = None
-    if os.path.exists(TOKEN_FILE):
+CALENDAR_EVENTS_URL = 'https://www.googleapis.com/calendar/v3/calendars/{calendar_id}/events'
+_calendar_credentials = None
+
+def get_calendar_credentials():
+    """Authenticate once per run; token refreshes go through the shared HTTP client's session."""
+    global _calendar_credentials
+    creds = _calendar_credentials
+    if creds is None and os.path.exists(TOKEN_FILE):
         creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
+            creds.refresh(Request(session=get_http_client().session))
         else:
             flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, SCOPES)
             creds = flow.run_local_server(port=8080)  # Explicitly set the port
         with open(TOKEN_FILE, 'w') as token:
             token.write(creds.to_json())
-    return build('calendar', 'v3', credentials=creds)
+    _calendar_credentials = creds
+    return creds
 
 def create_google_calendar_event(candidate_name, interviewer_name, event_date, time_slot):
     """Create a Google Calendar event for the interview."""
     try:
-        service = get_calendar_service()
+        creds = get_calendar_credentials()
         
         # Parse time slot (assuming format 'HH:MM-HH:MM')
         start_time, end_time = time_slot.split('-')
@@ -109,10 +114,13 @@ def create_google_calendar_event(candidate_name, interviewer_name, event_date, t
                 'useDefault': True,
             },
         }
-        created_event = service.events().insert(
-            calendarId='primary',
-            body=event
-        ).execute()
+        response = get_http_client().post(
+            CALENDAR_EVENTS_URL.format(calendar_id='primary'),
+            headers={'Authorization': f'Bearer {creds.token}'},
+            json=event
+        )
+        response.raise_for_status()
+        created_event = response.json()
         
         print(f"Event created: {created_event.get('htmlLink')}")
         return created_event
@@ -228,5 +236,6 @@ if results:
         print("-" * 50)
         # Create a Google Calendar event
         create_google_calendar_event(candidate_name, interviewer_name, selected_date, selected_time_slot)
+    print(f"HTTP client stats: {get_http_client().stats()}")
 else:
     print("No matching interviewers found for any candidate.")
\ No newline at end of file
@@ -0,0 +1,195 @@
+import os
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "60"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5"))
+HTTP_MAX_PER_HOST = int(os.getenv("HTTP_MAX_PER_HOST", "8"))
+# Longest a request waits for a free per-host slot before giving up
+HTTP_SLOT_TIMEOUT = float(os.getenv("HTTP_SLOT_TIMEOUT", "300"))
+# Rate limits and transient gateway errors, retried for idempotent methods
+RETRY_STATUSES = (429, 502, 503, 504)
+# Statuses at which a POST was rejected before being processed, so resending it is safe
+POST_RETRY_STATUSES = (429,)
+LATENCY_WINDOW = 1000
+
+
+class HostBusyError(requests.RequestException):
+    """No per-host slot freed up within the slot timeout."""
+
+
+class IdempotentRetry(Retry):
+    """
+    Retry policy that never resends a POST the service may already have acted on.
+    Idempotent methods retry on connection and read errors and RETRY_STATUSES. A POST
+    is not in allowed_methods, so urllib3 only retries it when the connection could not
+    be made (nothing was sent); this adds POST_RETRY_STATUSES on top.
+    """
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if method.upper() == "POST" and status_code in POST_RETRY_STATUSES:
+            return bool(self.total)
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+class HostStats:
+    """Request counters and a rolling window of latencies for one host."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.in_flight = 0
+        self.statuses = {}
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def snapshot(self):
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction):
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * fraction))], 2) if latencies else None
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "in_flight": self.in_flight,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "p50_ms": percentile(0.5),
+            "p99_ms": percentile(0.99),
+        }
+
+
+class HttpClient:
+    """
+    One pooled keep-alive session for every outbound HTTP call. Requests get a default
+    (connect, read) timeout, failures are retried with exponential backoff (honouring
+    Retry-After) as IdempotentRetry allows, and at most `max_per_host` requests per
+    host are in flight at once. Successful streamed responses hold their slot until they
+    are closed; error responses are read in full and release it straight away, so a
+    caller that raises on the status cannot leak the slot. Latency is time until the
+    response headers (or the whole body, when not streaming).
+    """
+
+    def __init__(self, timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT), retries=HTTP_RETRIES,
+                 backoff_factor=HTTP_BACKOFF_FACTOR, max_per_host=HTTP_MAX_PER_HOST, host_limits=None,
+                 slot_timeout=HTTP_SLOT_TIMEOUT):
+        self.timeout = timeout
+        self.slot_timeout = slot_timeout
+        self.max_per_host = max_per_host
+        self.host_limits = dict(host_limits or {})
+        self.session = requests.Session()
+        retry = IdempotentRetry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            respect_retry_after_header=True,
+            raise_on_status=False,  # hand back the last response so raise_for_status() reports it
+        )
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=max(max_per_host, *self.host_limits.values(), 1),
+                              max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._lock = threading.Lock()
+        self._slots = {}
+        self._stats = {}
+
+    def set_host_limit(self, host, limit):
+        """Cap concurrent requests to `host`; takes effect for hosts not contacted yet."""
+        with self._lock:
+            self.host_limits[host] = limit
+
+    def _host_state(self, host):
+        with self._lock:
+            if host not in self._slots:
+                self._slots[host] = threading.BoundedSemaphore(self.host_limits.get(host, self.max_per_host))
+                self._stats[host] = HostStats()
+            return self._slots[host], self._stats[host]
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlparse(url).netloc
+        slot, stats = self._host_state(host)
+        if not slot.acquire(timeout=self.slot_timeout):
+            raise HostBusyError(f"No free connection slot for {host} after {self.slot_timeout:.0f}s")
+        with self._lock:
+            stats.in_flight += 1
+        released = threading.Event()
+
+        def release():
+            if not released.is_set():
+                released.set()
+                with self._lock:
+                    stats.in_flight -= 1
+                slot.release()
+
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            with self._lock:
+                stats.requests += 1
+                stats.errors += 1
+            release()
+            raise
+        elapsed = (time.perf_counter() - start) * 1000
+        retry_state = getattr(response.raw, "retries", None)
+        with self._lock:
+            stats.requests += 1
+            stats.retries += len(retry_state.history) if retry_state else 0
+            stats.statuses[response.status_code] = stats.statuses.get(response.status_code, 0) + 1
+            stats.errors += response.status_code >= 400
+            stats.latencies.append(elapsed)
+
+        if kwargs.get("stream") and response.status_code < 400:
+            close = response.close
+
+            def close_and_release():
+                try:
+                    close()
+                finally:
+                    release()
+            response.close = close_and_release
+        else:
+            if kwargs.get("stream"):
+                try:
+                    response.content  # error bodies are small; reading one returns the connection to the pool
+                except requests.RequestException:
+                    response.close()
+            release()
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request("HEAD", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def stats(self):
+        """Per-host counters and latency percentiles, e.g. for a batch summary or a debug panel."""
+        with self._lock:
+            return {host: stats.snapshot() for host, stats in sorted(self._stats.items())}
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """The process-wide client every module shares, so connections are reused across calls."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
@@ -1,7 +1,17 @@
 import os
 from dotenv import load_dotenv
+import hashlib
 import json
+import queue
+import re
+import shutil
 import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from types import SimpleNamespace
 import requests
 import assemblyai as aai
 from moviepy.video.io.VideoFileClip import VideoFileClip
@@ -9,6 +19,9 @@ import streamlit as st
 from PIL import Image
 import numpy as np
 
+from analysis_jobs import AnalysisJobQueue
+from http_client import HTTP_CONNECT_TIMEOUT, get_http_client
+
 # Load environment variables
 load_dotenv()
 
@@ -16,12 +29,95 @@ load_dotenv()
 aai.settings.api_key = os.getenv("ASSEMBLYAI_API_KEY")
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 
-# Initialize the database
-def initialize_database():
-    if os.path.exists("candidate_database.db"):
-        os.remove("candidate_database.db")
+CANDIDATE_DB = "candidate_database.db"
+
+# Normalized storage for generated (and edited) feedback: one analysis per candidate
+# interview, its categories, their question/answer pairs and each pair's pros and cons.
+FEEDBACK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY,
+    candidate_email TEXT NOT NULL,
+    interview_date TEXT NOT NULL,
+    job_id TEXT,
+    video_path TEXT,
+    video_file_id TEXT,
+    video_hash TEXT,
+    video_duration REAL,
+    transcript_text TEXT,
+    average_score INTEGER,
+    recommendation TEXT,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (candidate_email, interview_date)
+);
+CREATE TABLE IF NOT EXISTS feedback_categories (
+    id INTEGER PRIMARY KEY,
+    analysis_id INTEGER NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_feedback_categories_analysis ON feedback_categories (analysis_id, position);
+CREATE TABLE IF NOT EXISTS feedback_qa (
+    id INTEGER PRIMARY KEY,
+    category_id INTEGER NOT NULL REFERENCES feedback_categories(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    question TEXT,
+    answer TEXT,
+    feedback_summary TEXT,
+    score INTEGER,
+    start_time REAL,
+    end_time REAL
+);
+CREATE INDEX IF NOT EXISTS idx_feedback_qa_category ON feedback_qa (category_id, position);
+CREATE TABLE IF NOT EXISTS feedback_points (
+    qa_id INTEGER NOT NULL REFERENCES feedback_qa(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL CHECK(kind IN ('pro', 'con')),
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (qa_id, kind, position)
+) WITHOUT ROWID;
+"""
+
+# Candidate lookup: a case-insensitive index for exact name matches (so `Email = ? OR Name = ?`
+# becomes two index probes), a word-prefix FTS5 index over name and email, and a trigram
+# index over names for typo-tolerant matching. Both FTS tables read their text from
+# `candidates` and are kept in sync by triggers.
+CANDIDATE_SEARCH_SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_candidates_name ON candidates (Name COLLATE NOCASE);
+CREATE VIRTUAL TABLE IF NOT EXISTS candidates_fts USING fts5(
+    Name, Email, content='candidates', tokenize='unicode61 remove_diacritics 2', prefix='1 2 3'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS candidates_trigram USING fts5(
+    Name, content='candidates', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS candidates_search_insert AFTER INSERT ON candidates BEGIN
+    INSERT INTO candidates_fts (rowid, Name, Email) VALUES (new.rowid, new.Name, new.Email);
+    INSERT INTO candidates_trigram (rowid, Name) VALUES (new.rowid, new.Name);
+END;
+CREATE TRIGGER IF NOT EXISTS candidates_search_delete AFTER DELETE ON candidates BEGIN
+    INSERT INTO candidates_fts (candidates_fts, rowid, Name, Email) VALUES ('delete', old.rowid, old.Name, old.Email);
+    INSERT INTO candidates_trigram (candidates_trigram, rowid, Name) VALUES ('delete', old.rowid, old.Name);
+END;
+CREATE TRIGGER IF NOT EXISTS candidates_search_update AFTER UPDATE OF Name, Email ON candidates BEGIN
+    INSERT INTO candidates_fts (candidates_fts, rowid, Name, Email) VALUES ('delete', old.rowid, old.Name, old.Email);
+    INSERT INTO candidates_trigram (candidates_trigram, rowid, Name) VALUES ('delete', old.rowid, old.Name);
+    INSERT INTO candidates_fts (rowid, Name, Email) VALUES (new.rowid, new.Name, new.Email);
+    INSERT INTO candidates_trigram (rowid, Name) VALUES (new.rowid, new.Name);
+END;
+"""
+CANDIDATE_SEARCH_LIMIT = 10
+# Matches scored per search. FTS5 yields matches in rowid order, so capping the pool keeps
+# short, common prefixes ("a", "sh") from scoring every candidate on each keystroke.
+CANDIDATE_SEARCH_POOL = 200
 
-    conn = sqlite3.connect("candidate_database.db")
+def rebuild_candidate_search(conn):
+    """Re-index every candidate, e.g. after a bulk load with the triggers dropped or a VACUUM (which may renumber rowids)."""
+    conn.execute("INSERT INTO candidates_fts (candidates_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO candidates_trigram (candidates_trigram) VALUES ('rebuild')")
+    conn.commit()
+
+# Initialize the database
+def initialize_database(db_path=CANDIDATE_DB):
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS candidates (
@@ -32,7 +128,18 @@ def initialize_database():
         VideoInterviewLink TEXT
     );
     """)
+    analysis_columns = {row[1] for row in cursor.execute("PRAGMA table_info(analyses)")}
+    for column in ("video_file_id", "video_hash"):
+        if analysis_columns and column not in analysis_columns:
+            cursor.execute(f"ALTER TABLE analyses ADD COLUMN {column} TEXT")
+    cursor.executescript(FEEDBACK_SCHEMA)
+    search_exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'candidates_fts'").fetchone()
+    cursor.executescript(CANDIDATE_SEARCH_SCHEMA)
     conn.commit()
+    if not search_exists:
+        # Databases created before the search index existed need their rows indexed once
+        rebuild_candidate_search(conn)
 
     cursor.execute("SELECT COUNT(*) FROM candidates")
     if cursor.fetchone()[0] == 0:
@@ -48,26 +155,184 @@ def initialize_database():
 
     conn.close()
 
-def download_video(drive_url, video_path="downloaded_video.mp4"):
-    file_id = drive_url.split('/d/')[1].split('/')[0]
+VIDEO_CACHE_DIR = os.getenv("VIDEO_CACHE_DIR", "video_cache")
+VIDEO_CACHE_MAX_BYTES = int(os.getenv("VIDEO_CACHE_MAX_BYTES", str(10 * 1024 ** 3)))
+VIDEO_JOB_TTL_SECONDS = 24 * 60 * 60
+DOWNLOAD_ATTEMPTS = 5
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+_download_locks = {}
+_download_locks_guard = threading.Lock()
+_evict_lock = threading.Lock()
+
+def _note(on_note, message):
+    """Pass a warning or informational message to the caller's on_note callback, if any."""
+    if on_note is not None:
+        on_note(message)
+
+def extract_drive_file_id(drive_url):
+    return drive_url.split('/d/')[1].split('/')[0]
+
+def _download_lock(cache_key):
+    with _download_locks_guard:
+        return _download_locks.setdefault(cache_key, threading.Lock())
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(DOWNLOAD_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def video_content_hash(video_path):
+    """
+    SHA-256 of a downloaded video. Cached videos carry a .sha256 sidecar written at
+    download time, so this is normally a small file read rather than a full rehash.
+    """
+    sidecar = video_path + ".sha256"
+    if os.path.exists(sidecar):
+        with open(sidecar) as file:
+            return file.read().strip()
+    return _file_sha256(video_path)
+
+def _fetch_to_cache(download_url, cache_path):
+    """
+    Stream download_url into cache_path, resuming from a previous partial download with
+    an HTTP Range request whenever the connection drops.
+    """
+    part_path = cache_path + ".part"
+    last_error = None
+    for _ in range(DOWNLOAD_ATTEMPTS):
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            with get_http_client().get(download_url, stream=True, headers=headers) as response:
+                if response.status_code == 416:
+                    # The partial file already holds every byte.
+                    break
+                response.raise_for_status()
+                mode = 'ab' if offset and response.status_code == 206 else 'wb'
+                with open(part_path, mode) as file:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        file.write(chunk)
+                expected = response.headers.get("Content-Length")
+                if expected is not None and mode == 'ab':
+                    expected = offset + int(expected)
+                if expected is not None and os.path.getsize(part_path) < int(expected):
+                    raise requests.RequestException("Connection closed before the download completed")
+            break
+        except requests.RequestException as e:
+            last_error = e
+    else:
+        raise last_error
+
+    with open(cache_path + ".sha256", 'w') as file:
+        file.write(_file_sha256(part_path))
+    os.replace(part_path, cache_path)
+
+def _remove_cached(path):
+    """Delete a cache file, ignoring one another worker or process already removed."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def _cache_entries(directory, suffix):
+    """(mtime, size, path, inode, link count) for each file in directory ending in suffix."""
+    entries = []
+    for name in os.listdir(directory) if os.path.isdir(directory) else []:
+        path = os.path.join(directory, name)
+        if not name.endswith(suffix):
+            continue
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path, (stat.st_dev, stat.st_ino), stat.st_nlink))
+    return entries
+
+def _evict_video_cache(keep_path, max_bytes=VIDEO_CACHE_MAX_BYTES):
+    """
+    Keep the disk used by the video cache under max_bytes: drop stale per-job files, then
+    least recently used cached videos and preview thumbnails. Job files that no longer
+    share their data with a cache entry (copies, audio tracks, links to evicted videos)
+    count against the cap, and a video still linked by a running job is never evicted,
+    since removing it would free nothing. Runs under one process-wide lock, since
+    downloads of different videos would otherwise race to delete the same files.
+    """
+    with _evict_lock:
+        jobs_dir = os.path.join(VIDEO_CACHE_DIR, "jobs")
+        now = time.time()
+        for mtime, _, path, _, _ in _cache_entries(jobs_dir, ""):
+            if now - mtime > VIDEO_JOB_TTL_SECONDS:
+                _remove_cached(path)
+
+        entries = _cache_entries(VIDEO_CACHE_DIR, ".mp4") + _cache_entries(FRAME_CACHE_DIR, ".jpg")
+        cached_inodes = {inode for _, _, _, inode, _ in entries}
+        total = sum(size for _, size, _, _, _ in entries)
+        total += sum(size for _, size, _, inode, _ in _cache_entries(jobs_dir, "") if inode not in cached_inodes)
+        for _, size, path, _, links in sorted(entries):
+            if total <= max_bytes:
+                break
+            if path == keep_path or links > 1:
+                continue
+            _remove_cached(path)
+            if path.endswith(".mp4"):
+                _remove_cached(path + ".sha256")
+            total -= size
+
+def release_video(video_path):
+    """
+    Give back a job path from download_video, with its hash sidecar and extracted audio,
+    once the job no longer needs the file. Paths of crashed jobs are swept after
+    VIDEO_JOB_TTL_SECONDS.
+    """
+    for path in (video_path, video_path + ".sha256", os.path.splitext(video_path)[0] + ".mp3"):
+        _remove_cached(path)
+
+def download_video(drive_url, video_path=None):
+    """
+    Download a Drive video through the local cache and return a path private to this job.
+    Cache entries are keyed by Drive file ID and content length, so re-analyzing a video
+    skips the download entirely. The returned job path is a hard link into the cache (a
+    copy where links are unsupported), so cache eviction never pulls a file out from
+    under a running analysis; pass it to release_video when the job is done. Raises
+    RuntimeError if the download fails.
+    """
+    file_id = extract_drive_file_id(drive_url)
     download_url = f'https://drive.google.com/uc?id={file_id}'
-    
+
     try:
-        response = requests.get(download_url, stream=True)
-        response.raise_for_status()
-        
-        with open(video_path, 'wb') as file:
-            for chunk in response.iter_content(chunk_size=108192):
-                file.write(chunk)
-        
+        os.makedirs(os.path.join(VIDEO_CACHE_DIR, "jobs"), exist_ok=True)
+        with get_http_client().head(download_url, allow_redirects=True) as response:
+            response.raise_for_status()
+            content_length = response.headers.get("Content-Length", "unknown")
+        cache_key = f"{file_id}-{content_length}"
+        cache_path = os.path.join(VIDEO_CACHE_DIR, f"{cache_key}.mp4")
+
+        with _download_lock(cache_key):
+            if not os.path.exists(cache_path):
+                _fetch_to_cache(download_url, cache_path)
+            os.utime(cache_path)  # mark as most recently used
+            _evict_video_cache(cache_path)
+
+        if video_path is None:
+            video_path = os.path.join(VIDEO_CACHE_DIR, "jobs", f"{uuid.uuid4().hex}.mp4")
+        if os.path.exists(video_path):
+            os.remove(video_path)
+        try:
+            os.link(cache_path, video_path)
+        except OSError:
+            shutil.copyfile(cache_path, video_path)
+        shutil.copyfile(cache_path + ".sha256", video_path + ".sha256")
         return video_path
     except requests.RequestException as e:
-        st.error(f"Failed to download video: {e}")
-        return None
+        raise RuntimeError(f"Failed to download video: {e}") from e
 
-def get_video_duration(video_path):
+def get_video_duration(video_path, on_note=None):
     """
-    Get the duration of the video using moviepy.
+    Get the duration of the video using moviepy, or None (reported to on_note) if it
+    cannot be read.
     """
     try:
         video_clip = VideoFileClip(video_path)
@@ -75,152 +340,864 @@ def get_video_duration(video_path):
         video_clip.close()
         return duration
     except Exception as e:
-        st.error(f"Error getting video duration: {e}")
+        _note(on_note, f"Error getting video duration: {e}")
         return None
 
-def transcribe_video(video_path):
+AUDIO_SAMPLE_RATE = 16000
+AUDIO_BITRATE = "32k"
+
+def extract_audio(video_path, audio_path=None):
     """
-    Transcribe video directly using AssemblyAI's video-to-text API.
+    Extract a compressed mono speech-quality MP3 track from the video with moviepy.
+    Returns the audio path, or None if the video has no audio track.
     """
+    audio_path = audio_path or os.path.splitext(video_path)[0] + ".mp3"
+    video_clip = VideoFileClip(video_path)
     try:
-        transcriber = aai.Transcriber()
-        transcript = transcriber.transcribe(video_path)
-        return transcript
-    except Exception as e:
-        st.error(f"Error during transcription: {e}")
+        if video_clip.audio is None:
+            return None
+        video_clip.audio.write_audiofile(
+            audio_path,
+            fps=AUDIO_SAMPLE_RATE,
+            codec="libmp3lame",
+            bitrate=AUDIO_BITRATE,
+            ffmpeg_params=["-ac", "1"],
+            logger=None,
+        )
+    finally:
+        video_clip.close()
+    return audio_path
+
+TRANSCRIPT_DB = os.getenv("TRANSCRIPT_DB", "transcript_store.db")
+TRANSCRIPTION_CONFIG = {"speaker_labels": True}
+WORD_FIELDS = ("text", "start", "end", "speaker", "confidence")
+UTTERANCE_FIELDS = ("speaker", "start", "end", "text")
+
+def _config_key(config):
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+
+def _encode_columns(items, fields):
+    """Pack objects into zlib-compressed column arrays, far smaller than a list of dicts."""
+    columns = {field: [getattr(item, field, None) for item in items or []] for field in fields}
+    return zlib.compress(json.dumps(columns, separators=(",", ":")).encode())
+
+def _decode_columns(blob, fields):
+    columns = json.loads(zlib.decompress(blob))
+    return [SimpleNamespace(**dict(zip(fields, values))) for values in zip(*(columns[field] for field in fields))]
+
+def _transcript_store():
+    conn = sqlite3.connect(TRANSCRIPT_DB)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS transcripts (
+        video_hash TEXT NOT NULL,
+        config_key TEXT NOT NULL,
+        text TEXT NOT NULL,
+        words BLOB NOT NULL,
+        utterances BLOB NOT NULL,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (video_hash, config_key)
+    ) WITHOUT ROWID;
+    """)
+    return conn
+
+def load_transcript(video_hash, config=TRANSCRIPTION_CONFIG):
+    """Return a stored transcript with .text, .words and .utterances, or None on a miss."""
+    conn = _transcript_store()
+    try:
+        row = conn.execute(
+            "SELECT text, words, utterances FROM transcripts WHERE video_hash = ? AND config_key = ?",
+            (video_hash, _config_key(config)),
+        ).fetchone()
+    finally:
+        conn.close()
+    if row is None:
         return None
+    return SimpleNamespace(
+        text=row[0],
+        words=_decode_columns(row[1], WORD_FIELDS),
+        utterances=_decode_columns(row[2], UTTERANCE_FIELDS),
+    )
 
-def get_first_frame(video_path, timestamp):
+def save_transcript(video_hash, transcript, config=TRANSCRIPTION_CONFIG):
+    conn = _transcript_store()
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO transcripts (video_hash, config_key, text, words, utterances) VALUES (?, ?, ?, ?, ?)",
+            (video_hash, _config_key(config), transcript.text or "",
+             _encode_columns(transcript.words, WORD_FIELDS),
+             _encode_columns(transcript.utterances, UTTERANCE_FIELDS)),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+def transcribe_video(video_path, on_note=None):
     """
-    Get the first frame of a video segment as an image.
+    Transcribe the interview with AssemblyAI, uploading only the extracted audio track.
+    Transcripts are stored by video content hash and transcription config, so a video
+    that was transcribed before is answered from the local store without an upload.
+    Falls back to uploading the full video if audio extraction fails. The upload size
+    and any fallback are reported to on_note; a failed transcription raises RuntimeError.
     """
+    video_hash = video_content_hash(video_path)
+    stored = load_transcript(video_hash)
+    if stored is not None:
+        return stored
+
+    upload_path = video_path
     try:
-        video_clip = VideoFileClip(video_path)
-        frame = video_clip.get_frame(timestamp)
-        video_clip.close()
-        
-        # Convert numpy array to PIL Image
-        frame_image = Image.fromarray(frame)
-        return frame_image
+        audio_path = extract_audio(video_path)
+        if audio_path:
+            upload_path = audio_path
+            video_bytes = os.path.getsize(video_path)
+            audio_bytes = os.path.getsize(audio_path)
+            saved = 100 * (1 - audio_bytes / video_bytes) if video_bytes else 0
+            _note(on_note, f"Uploading audio only: {audio_bytes / 1024 ** 2:.1f} MB instead of "
+                           f"{video_bytes / 1024 ** 2:.1f} MB ({saved:.0f}% smaller)")
     except Exception as e:
-        st.error(f"Error extracting first frame: {e}")
-        return None
+        _note(on_note, f"Audio extraction failed, uploading the full video instead: {e}")
+
+    try:
+        transcriber = aai.Transcriber(config=aai.TranscriptionConfig(**TRANSCRIPTION_CONFIG))
+        transcript = transcriber.transcribe(upload_path)
+    except Exception as e:
+        raise RuntimeError(f"Error during transcription: {e}") from e
+    if transcript.status == aai.TranscriptStatus.error:
+        raise RuntimeError(f"Error during transcription: {transcript.error}")
+    save_transcript(video_hash, transcript)
+    return transcript
+
+FRAME_CACHE_DIR = os.path.join(VIDEO_CACHE_DIR, "frames")
+THUMBNAIL_SIZE = (480, 270)
 
-def analyze_transcription_and_generate_feedback(transcription, video_duration):
-    """
-    Analyze the transcription and generate feedback for all questions in a single API request.
-    Group questions by category.
-    """
-    prompt = f"""
-    Below is a transcription of an interview. Perform the following tasks:
-    1. Extract the interviewer's questions and the candidate's answers.
-    2. Categorize each question (e.g., EDA, AI, JavaScript, etc.).
-    3. For each question-answer pair, generate feedback including:
-       - A summary of the candidate's performance.
-       - A score (0-100 scale) for the category.
-       - A list of pros and cons for the candidate's answer.
-    4. Include the start and end timestamps for each question-answer pair (relative to the start of the video).
-    5. Group questions with the same category into a single block.
-
-    Transcription:
-    {transcription.text}
-
-    Return the data in STRICT JSON format as follows:
-    {{
-        "categories": [
-            {{
-                "category": "Category/topic of the question",
-                "questions_and_answers": [
-                    {{
-                        "question": "Interviewer's question",
-                        "answer": "Candidate's answer",
-                        "feedback": {{
-                            "feedback_summary": "A short summary of the candidate's response",
-                            "score": "Score based on knowledge demonstrated in the category",
-                            "pros": ["List of strengths in the candidate's answer"],
-                            "cons": ["List of weaknesses in the candidate's answer"]
-                        }},
-                        "start_time": "Start time of the question in seconds (relative to video start)",
-                        "end_time": "End time of the answer in seconds (relative to video start)"
-                    }},
-                    ...
-                ]
-            }},
-            ...
-        ]
-    }}
-
-    IMPORTANT:
-    - Return ONLY valid JSON. Do not include any additional text or explanations.
-    - Ensure all timestamps are relative to the start of the video.
-    - Ensure the JSON is properly formatted and can be parsed by a JSON parser.
+def _frame_cache_path(video_hash, timestamp):
+    return os.path.join(FRAME_CACHE_DIR, f"{video_hash}_{int(round(timestamp * 1000))}.jpg")
+
+def cached_frames(video_hash, timestamps):
+    """
+    Preview frames already in the frame cache, which needs no video. Returns a dict of
+    timestamp -> PIL Image and the ascending list of timestamps that are not cached.
+    """
+    frames, missing = {}, []
+    for timestamp in sorted(set(timestamps)):
+        cache_path = _frame_cache_path(video_hash, timestamp)
+        try:
+            frames[timestamp] = Image.open(cache_path)
+            os.utime(cache_path)  # keep recently viewed thumbnails out of cache eviction
+        except FileNotFoundError:
+            missing.append(timestamp)
+    return frames, missing
+
+def extract_frames(video_path, timestamps, on_note=None):
+    """
+    Extract downscaled preview frames for many timestamps with one decoder.
+    Timestamps are decoded in ascending order so moviepy reads forward through the
+    file instead of re-seeking, and each thumbnail is cached on disk keyed by
+    (video hash, timestamp). Returns a dict of timestamp -> PIL Image; errors are
+    reported to on_note and return the frames extracted so far.
     """
+    frames = {}
     try:
-        headers = {
-            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "model": "qwen/qwen2.5-vl-32b-instruct:free",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            "temperature": 0.7
-        }
-        
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers=headers,
-            json=payload
-        )
-        
-        response.raise_for_status()
-        response_data = response.json()
-        
-        # Extract the content from the response
-        response_text = response_data['choices'][0]['message']['content'].strip()
-        
-        # Clean the response text
-        if response_text.startswith("```json"):
-            response_text = response_text[7:-3].strip()
-
-        # Parse the JSON response
-        data = json.loads(response_text)
-        return data["categories"]
-    except json.JSONDecodeError:
-        st.error("The API response is not valid JSON. Please check the prompt or API output.")
-        st.write("Raw API Response:", response_text)
-        return None
+        os.makedirs(FRAME_CACHE_DIR, exist_ok=True)
+        video_hash = video_content_hash(video_path)
+        frames, missing = cached_frames(video_hash, timestamps)
+        if missing:
+            video_clip = VideoFileClip(video_path)
+            try:
+                for timestamp in missing:
+                    frame_image = Image.fromarray(video_clip.get_frame(min(timestamp, video_clip.duration)))
+                    frame_image.thumbnail(THUMBNAIL_SIZE)
+                    frame_image.save(_frame_cache_path(video_hash, timestamp), "JPEG", quality=85)
+                    frames[timestamp] = frame_image
+            finally:
+                video_clip.close()
     except Exception as e:
-        st.error(f"An error occurred while analyzing the transcription: {e}")
-        return None
+        _note(on_note, f"Error extracting preview frames: {e}")
+    return frames
+
+def get_first_frame(video_path, timestamp):
+    """
+    Get the first frame of a video segment as an image.
+    """
+    return extract_frames(video_path, [timestamp]).get(timestamp)
+
+# Disfluencies dropped from utterances before they are sent to the model
+FILLER_PATTERN = re.compile(r"\b(?:u+h+m*|u+m+|e+r+m*|a+h+|h+m+|m+h*m+)\b[,.]*", re.IGNORECASE)
+REPEATED_WORD_PATTERN = re.compile(r"\b(\w+)(?:[\s,]+\1\b)+", re.IGNORECASE)
+
+def compact_text(text):
+    """'Um, so I I think, uh, yes' -> 'so I think, yes'"""
+    text = FILLER_PATTERN.sub("", text)
+    text = REPEATED_WORD_PATTERN.sub(r"\1", text)
+    text = re.sub(r"\s+([,.?!])", r"\1", " ".join(text.split()))
+    return text.lstrip(",. ")
+
+def transcript_utterances(transcription):
+    """Speaker-labelled utterances (times in ms); a transcript without them becomes one utterance."""
+    utterances = getattr(transcription, "utterances", None)
+    if utterances:
+        return utterances
+    words = getattr(transcription, "words", None) or []
+    return [SimpleNamespace(speaker="?", start=words[0].start if words else 0,
+                            end=words[-1].end if words else 0, text=transcription.text or "")]
+
+def encode_utterances(utterances, first_index=0):
+    """One line per utterance: '<index> <speaker>@<whole seconds from video start> <compacted text>'."""
+    return "\n".join(
+        f"{first_index + offset} {u.speaker}@{int(u.start // 1000)} {compact_text(u.text)}"
+        for offset, u in enumerate(utterances)
+    )
+
+def apply_utterance_times(qa, utterances):
+    """Replace the model's start/end utterance indices with exact start/end times in seconds."""
+    for index_key, time_key, boundary in (("start_utterance", "start_time", "start"), ("end_utterance", "end_time", "end")):
+        try:
+            index = int(qa.pop(index_key))
+            qa[time_key] = getattr(utterances[index], boundary) / 1000 if 0 <= index < len(utterances) else None
+        except (KeyError, TypeError, ValueError):
+            qa.setdefault(time_key, None)
+    return qa
+
+def build_feedback_prompt(transcript_text):
+    return f"""Below is an interview transcript, one utterance per line: "<id> <speaker>@<seconds from video start> <text>" (filler words removed).
+Tasks:
+1. Extract the interviewer's questions and the candidate's answers.
+2. Categorize each question (e.g., EDA, AI, JavaScript, etc.) and group questions with the same category into a single block.
+3. For each question-answer pair give a short summary of the candidate's performance, a 0-100 score for the category, and the pros and cons of the answer.
+4. Give the id of the utterance where the question starts and the id of the utterance where the answer ends.
+
+Transcript:
+{transcript_text}
+
+Return ONLY valid, parseable JSON with no additional text, in this format:
+{{"categories": [{{"category": "Category/topic", "questions_and_answers": [{{
+  "question": "Interviewer's question",
+  "answer": "Candidate's answer",
+  "feedback": {{"feedback_summary": "Short summary", "score": 0, "pros": ["Strength"], "cons": ["Weakness"]}},
+  "start_utterance": 0,
+  "end_utterance": 0
+}}]}}]}}
+"""
+
+OPENROUTER_API_URL = os.getenv("OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions")
+OPENROUTER_MODEL = "qwen/qwen2.5-vl-32b-instruct:free"
+# A non-streamed completion arrives all at once, after the whole response is generated
+OPENROUTER_READ_TIMEOUT = float(os.getenv("OPENROUTER_READ_TIMEOUT", "300"))
+
+class IncrementalFeedbackParser:
+    """
+    Incremental parser for the {"categories": [...]} feedback JSON as it streams in.
+    feed() returns the question/answer blocks and categories completed by the new text,
+    as ("qa", category_name, qa) and ("category", category) events, so the UI can render
+    them before the rest of the response has been generated.
+    """
+
+    # Nesting depths inside {"categories": [{..., "questions_and_answers": [{...}]}]}
+    CATEGORY_DEPTH = 3
+    QA_DEPTH = 5
+
+    def __init__(self):
+        self.buffer = ""
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._starts = {}
+
+    def feed(self, text):
+        self.buffer += text
+        events = []
+        while self._position < len(self.buffer):
+            char = self.buffer[self._position]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = self._depth > 0
+            elif char in "{[":
+                self._depth += 1
+                self._starts[self._depth] = self._position
+            elif char in "}]" and self._depth > 0:
+                events.extend(self._close(char))
+                self._depth -= 1
+            self._position += 1
+        return events
+
+    def _close(self, char):
+        if char != "}" or self._depth not in (self.CATEGORY_DEPTH, self.QA_DEPTH):
+            return []
+        block = self.buffer[self._starts[self._depth]:self._position + 1]
+        try:
+            value = json.loads(block)
+        except json.JSONDecodeError:
+            return []
+        if self._depth == self.CATEGORY_DEPTH:
+            return [("category", value)]
+        return [("qa", self._current_category(), value)]
+
+    def _current_category(self):
+        """Read the enclosing category's name from the text streamed so far."""
+        category_text = self.buffer[self._starts[self.CATEGORY_DEPTH]:self._position]
+        match = re.search(r'"category"\s*:\s*"((?:[^"\\]|\\.)*)"', category_text)
+        return json.loads(f'"{match.group(1)}"') if match else "General"
+
+    def result(self):
+        """Parse the complete response once the stream has ended."""
+        text = self.buffer.strip()
+        if text.startswith("```"):
+            text = text[text.index("\n") + 1:text.rindex("```")] if text.count("```") > 1 else text.strip("`")
+        try:
+            return json.loads(text)["categories"]
+        except json.JSONDecodeError as e:
+            e.response_text = self.buffer
+            raise
+
+def _openrouter_request(transcript_text, stream=False):
+    headers = {
+        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+        "Content-Type": "application/json"
+    }
+
+    payload = {
+        "model": OPENROUTER_MODEL,
+        "messages": [
+            {
+                "role": "user",
+                "content": build_feedback_prompt(transcript_text)
+            }
+        ],
+        "temperature": 0.7
+    }
+    if stream:
+        payload["stream"] = True
+
+    response = get_http_client().post(
+        OPENROUTER_API_URL,
+        headers=headers,
+        json=payload,
+        stream=stream,
+        timeout=(HTTP_CONNECT_TIMEOUT, OPENROUTER_READ_TIMEOUT)
+    )
+
+    try:
+        response.raise_for_status()
+    except requests.HTTPError:
+        response.close()
+        raise
+    return response
+
+def stream_chat_content(response):
+    """Yield the content deltas of an OpenAI-style chat-completions SSE stream."""
+    # SSE is always UTF-8, but a text/event-stream without a charset makes requests fall back to ISO-8859-1
+    response.encoding = "utf-8"
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue  # blank separators and ": keep-alive" comments
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            break
+        delta = json.loads(data)["choices"][0].get("delta", {})
+        if delta.get("content"):
+            yield delta["content"]
+
+def request_feedback(transcript_text, on_event=None):
+    """
+    Send one transcript (or transcript chunk) to OpenRouter and return its categories.
+    With on_event, the response is streamed and on_event is called with every
+    question/answer block and category as soon as it is complete.
+    Raises on HTTP or JSON errors so callers running it in worker threads can report them.
+    """
+    if on_event is not None:
+        parser = IncrementalFeedbackParser()
+        with _openrouter_request(transcript_text, stream=True) as response:
+            for content in stream_chat_content(response):
+                for event in parser.feed(content):
+                    on_event(event)
+        return parser.result()
+
+    response_data = _openrouter_request(transcript_text).json()
 
-def fetch_candidate_details(candidate_identifier):
-    conn = sqlite3.connect("candidate_database.db")
+    # Extract the content from the response
+    response_text = response_data['choices'][0]['message']['content'].strip()
+
+    # Clean the response text
+    if response_text.startswith("```json"):
+        response_text = response_text[7:-3].strip()
+
+    # Parse the JSON response
+    try:
+        return json.loads(response_text)["categories"]
+    except json.JSONDecodeError as e:
+        e.response_text = response_text
+        raise
+
+LLM_CHUNK_SECONDS = int(os.getenv("LLM_CHUNK_SECONDS", "600"))
+LLM_CHUNK_OVERLAP_SECONDS = int(os.getenv("LLM_CHUNK_OVERLAP_SECONDS", "60"))
+LLM_MAX_WORKERS = int(os.getenv("LLM_MAX_WORKERS", "4"))
+RAW_RESPONSE_NOTE_CHARS = 2000
+
+def split_transcript(transcription, window_seconds=LLM_CHUNK_SECONDS, overlap_seconds=LLM_CHUNK_OVERLAP_SECONDS):
+    """
+    Split a transcript into overlapping time windows that start and end on utterance
+    boundaries. Each chunk is returned in the compact encode_utterances form, numbered
+    with indices into transcript_utterances(transcription) so the model's references
+    map back to the video timeline whichever chunk they came from.
+    """
+    utterances = transcript_utterances(transcription)
+
+    window_ms = window_seconds * 1000
+    overlap_ms = overlap_seconds * 1000
+    chunks = []
+    i = 0
+    while i < len(utterances):
+        chunk_start = utterances[i].start
+        j = i + 1
+        while j < len(utterances) and utterances[j].end - chunk_start <= window_ms:
+            j += 1
+        chunks.append(encode_utterances(utterances[i:j], first_index=i))
+        if j >= len(utterances):
+            break
+        # The next window starts with the utterances that fall inside the overlap.
+        overlap_start = utterances[j - 1].end - overlap_ms
+        next_i = j
+        while next_i - 1 > i and utterances[next_i - 1].start >= overlap_start:
+            next_i -= 1
+        i = next_i
+    return chunks
+
+def _start_seconds(qa):
+    try:
+        return float(qa.get("start_time"))
+    except (TypeError, ValueError):
+        return float("inf")
+
+def merge_chunk_categories(chunk_results):
+    """
+    Merge per-chunk categories into one list, grouping by category name and dropping
+    question/answer pairs repeated in the overlap between neighbouring chunks. A repeat
+    is the same start_time coming from another chunk, whatever the wording; within one
+    chunk the question text tells apart several questions starting at one utterance.
+    Pairs without a start_time fall back to matching on the question text alone.
+    """
+    merged = {}
+    start_chunks = {}
+    seen_questions = set()
+    for chunk_index, categories in enumerate(chunk_results):
+        for category in categories:
+            name = category.get("category", "General").strip()
+            block = merged.setdefault(name.lower(), {"category": name, "questions_and_answers": []})
+            for qa in category.get("questions_and_answers", []):
+                start = _start_seconds(qa)
+                question_key = (start, " ".join(qa.get("question", "").lower().split()))
+                if question_key in seen_questions or start_chunks.get(start, chunk_index) != chunk_index:
+                    continue
+                seen_questions.add(question_key)
+                if start != float("inf"):
+                    start_chunks[start] = chunk_index
+                block["questions_and_answers"].append(qa)
+    for block in merged.values():
+        block["questions_and_answers"].sort(key=_start_seconds)
+    return [block for block in merged.values() if block["questions_and_answers"]]
+
+def analyze_transcription_and_generate_feedback(transcription, video_duration, on_event=None, on_note=None):
+    """
+    Analyze the transcription and generate feedback, grouping questions by category.
+    Long transcripts are split into overlapping utterance-aligned windows analyzed
+    concurrently (at most LLM_MAX_WORKERS at a time), so latency is bounded by the
+    slowest chunk and one failed chunk does not lose the rest of the interview.
+    With on_event, responses are streamed and on_event receives each completed
+    question/answer block on the calling thread, so it may render with Streamlit.
+    Utterance references in the responses are resolved to start/end times here.
+    Failed chunks are reported to on_note; if every chunk fails, RuntimeError is raised.
+    """
+    utterances = transcript_utterances(transcription)
+    chunks = split_transcript(transcription)
+    results = [None] * len(chunks)
+    failures = []
+    events = queue.Queue()
+    chunk_callback = events.put if on_event is not None else None
+    with ThreadPoolExecutor(max_workers=max(1, min(LLM_MAX_WORKERS, len(chunks)))) as executor:
+        futures = {executor.submit(request_feedback, chunk, chunk_callback): index for index, chunk in enumerate(chunks)}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            while not events.empty():
+                event = events.get()
+                if event[0] == "qa":
+                    apply_utterance_times(event[2], utterances)
+                    on_event(event)
+            for future in done:
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    failures.append((index, e))
+
+    messages = []
+    for index, e in sorted(failures, key=lambda failure: failure[0]):
+        if isinstance(e, json.JSONDecodeError):
+            raw = getattr(e, "response_text", "")
+            messages.append(f"The API response for part {index + 1} of {len(chunks)} is not valid JSON. "
+                            f"Raw API response: {raw[:RAW_RESPONSE_NOTE_CHARS]}")
+        else:
+            messages.append(f"An error occurred while analyzing part {index + 1} of {len(chunks)} of the transcription: {e}")
+
+    successful = [categories for categories in results if categories is not None]
+    if not successful:
+        raise RuntimeError("; ".join(messages) or "Feedback generation failed")
+    for message in messages:
+        _note(on_note, message)
+    for categories in successful:
+        for category in categories:
+            for qa in category.get("questions_and_answers", []):
+                apply_utterance_times(qa, utterances)
+    return merge_chunk_categories(successful)
+
+def _candidate_from_row(row):
+    return {
+        "Name": row[0],
+        "Email": row[1],
+        "InterviewDate": row[2],
+        "AppliedRole": row[3],
+        "VideoInterviewLink": row[4],
+    }
+
+def fetch_candidate_details(candidate_identifier, db_path=CANDIDATE_DB):
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
-    query = """
+    # Email first, then case-insensitive name; each is a single index probe
+    cursor.execute("""
     SELECT Name, Email, InterviewDate, AppliedRole, VideoInterviewLink
     FROM candidates
-    WHERE Email = ? OR Name = ?
-    """
-    cursor.execute(query, (candidate_identifier, candidate_identifier))
+    WHERE Email = ?
+    """, (candidate_identifier,))
     result = cursor.fetchone()
+    if not result:
+        cursor.execute("""
+        SELECT Name, Email, InterviewDate, AppliedRole, VideoInterviewLink
+        FROM candidates
+        WHERE Name = ? COLLATE NOCASE
+        LIMIT 1
+        """, (candidate_identifier,))
+        result = cursor.fetchone()
     conn.close()
     if result:
-        return {
-            "Name": result[0],
-            "Email": result[1],
-            "InterviewDate": result[2],
-            "AppliedRole": result[3],
-            "VideoInterviewLink": result[4],
-        }
+        return _candidate_from_row(result)
     else:
         return None
 
+def fetch_pending_candidates(limit=None, db_path=CANDIDATE_DB):
+    """Candidates with an interview video but no stored analysis for their interview date."""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("""
+        SELECT c.Name, c.Email, c.InterviewDate, c.AppliedRole, c.VideoInterviewLink
+        FROM candidates c
+        WHERE c.VideoInterviewLink IS NOT NULL AND c.VideoInterviewLink != ''
+          AND NOT EXISTS (
+              SELECT 1 FROM analyses a
+              WHERE a.candidate_email = c.Email AND (c.InterviewDate IS NULL OR a.interview_date = c.InterviewDate)
+          )
+        ORDER BY c.InterviewDate, c.Email
+        LIMIT ?
+        """, (-1 if limit is None else limit,)).fetchall()
+    finally:
+        conn.close()
+    return [_candidate_from_row(row) for row in rows]
+
+def _prefix_match_query(text):
+    """'john.do' -> '"john" "do"*': every word must match, the last one as a prefix."""
+    words = re.findall(r"\w+", text.lower())
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words[:-1]) + f' "{words[-1]}"*'
+
+_search_connections = threading.local()
+
+def _search_connection(db_path):
+    """
+    A connection per thread and database, kept open across searches. Search runs on every
+    keystroke, and opening a connection and attaching the FTS5 tables costs about as much
+    as the lookup itself.
+    """
+    connections = _search_connections.__dict__.setdefault("by_path", {})
+    if db_path not in connections:
+        connections[db_path] = sqlite3.connect(db_path)
+    return connections[db_path]
+
+def _has_term(cursor, word):
+    """Whether any name or email contains this exact word; one doclist probe."""
+    return cursor.execute("SELECT 1 FROM candidates_fts WHERE candidates_fts MATCH ? LIMIT 1",
+                          (f'"{word}"',)).fetchone() is not None
+
+def _word_prefix_matches(cursor, text, limit):
+    """
+    Names or emails matching every typed word, the last one as a prefix, from the first
+    CANDIDATE_SEARCH_POOL FTS5 matches. Ranked here (names matching more words, then
+    shorter names) rather than with bm25(), whose document counts scan each term's whole
+    posting list. FTS5 also builds the full doclist of a prefix longer than the indexed
+    ones (1-3 letters) up front, so a query that cannot match is skipped after cheap
+    exact-term probes, and a completely typed last word is tried as an exact term first.
+    """
+    words = re.findall(r"\w+", text.lower())
+    if not words or not all(_has_term(cursor, word) for word in words[:-1]):
+        return []
+    queries = [_prefix_match_query(text)]
+    if len(words[-1]) > 3 and _has_term(cursor, words[-1]):
+        queries.insert(0, " ".join(f'"{word}"' for word in words))
+    rows = {}
+    for query in queries:
+        for row in cursor.execute("""
+        SELECT c.Name, c.Email, c.InterviewDate, c.AppliedRole, c.VideoInterviewLink
+        FROM (SELECT rowid FROM candidates_fts WHERE candidates_fts MATCH ? LIMIT ?) f
+        JOIN candidates c ON c.rowid = f.rowid
+        """, (query, CANDIDATE_SEARCH_POOL)):
+            rows[row[1]] = row
+        if len(rows) >= limit:
+            break
+
+    def score(name):
+        name_words = re.findall(r"\w+", name.lower())
+        return (-sum(any(name_word.startswith(word) for name_word in name_words) for word in words), len(name))
+    scores = {name: score(name) for name in {row[0] for row in rows.values()}}
+    return sorted(rows.values(), key=lambda row: scores[row[0]])[:limit]
+
+def _word_variants(word):
+    """The word and each adjacent-letter swap of it, the commonest typo when typing a name."""
+    return {word} | {word[:i] + word[i + 1] + word[i] + word[i + 2:] for i in range(len(word) - 1)}
+
+def _word_trigrams(word):
+    """Trigrams of the word and of each adjacent-letter swap, so 'mayr' still shares 'mar'/'ary' with 'mary'."""
+    return sorted({variant[i:i + 3] for variant in _word_variants(word) for i in range(len(variant) - 2)})
+
+def _trigram_match_query(text, any_word=False):
+    """
+    'ananay mor' -> '("ana" OR "nan" OR ...) AND ("mor" OR ...)': each word of three or more
+    letters must share a trigram with the name (any_word=True ORs the words together
+    instead). _trigram_matches ranks the results.
+    """
+    groups = []
+    for word in re.findall(r"\w+", text.lower()):
+        trigrams = _word_trigrams(word)
+        if trigrams:
+            groups.append("(" + " OR ".join(f'"{trigram}"' for trigram in trigrams) + ")")
+    return (" OR " if any_word else " AND ").join(groups) or None
+
+def _leading_prefix_matches(cursor, text, limit):
+    """Names or emails starting with the typed text, straight from their indexes."""
+    text = text.strip()
+    if not text:
+        return []
+    upper = text + "\U0010ffff"
+    return cursor.execute("""
+    SELECT * FROM (
+        SELECT Name, Email, InterviewDate, AppliedRole, VideoInterviewLink FROM candidates
+        WHERE Name >= ? COLLATE NOCASE AND Name < ? COLLATE NOCASE
+        ORDER BY Name COLLATE NOCASE LIMIT ?
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT Name, Email, InterviewDate, AppliedRole, VideoInterviewLink FROM candidates
+        WHERE Email >= ? AND Email < ? ORDER BY Email LIMIT ?
+    )
+    LIMIT ?
+    """, (text, upper, limit, text.lower(), text.lower() + "\U0010ffff", limit, limit)).fetchall()
+
+def _trigram_matches(cursor, query, text, limit):
+    """
+    Top `limit` of the first CANDIDATE_SEARCH_POOL trigram matches, ranked by how many of
+    the query's trigrams the name contains, then by how close it is in length. Scored here
+    rather than with bm25(), whose per-term document counts scan every posting list of the
+    (very common) trigrams and cost tens of milliseconds on a large roster.
+    """
+    rows = cursor.execute("""
+    SELECT c.Name, c.Email, c.InterviewDate, c.AppliedRole, c.VideoInterviewLink
+    FROM (
+        SELECT rowid FROM candidates_trigram WHERE candidates_trigram MATCH ? LIMIT ?
+    ) t JOIN candidates c ON c.rowid = t.rowid
+    """, (query, CANDIDATE_SEARCH_POOL)).fetchall()
+    trigrams = {trigram for word in re.findall(r"\w+", text.lower()) for trigram in _word_trigrams(word)}
+
+    def score(name):
+        lowered = name.lower()
+        return (-sum(trigram in lowered for trigram in trigrams), abs(len(name) - len(text)))
+    scores = {name: score(name) for name in {row[0] for row in rows}}
+    return sorted(rows, key=lambda row: scores[row[0]])[:limit]
+
+def search_candidates(text, limit=CANDIDATE_SEARCH_LIMIT, db_path=CANDIDATE_DB):
+    """
+    Ranked top-`limit` candidates for a partial name or email. Passes run from cheapest and
+    most precise to broadest, each only while the list is short:
+    1. names or emails starting with the typed text (an index range scan);
+    2. word-prefix matches in any order, e.g. 'clark ma' (FTS5; name matches beat
+       email matches);
+    3. typo-tolerant trigram matches where every word shares a trigram with the name;
+    4. trigram matches on any word, so one badly mistyped word ('Zzqx Clark') does not
+       hide matches on the others.
+    Every FTS pass scores at most CANDIDATE_SEARCH_POOL matches, so a search costs a
+    bounded amount of work however large the roster grows; for the broad any-word pass
+    that means ranking a sample of the matches rather than all of them.
+    """
+    try:
+        cursor = _search_connection(db_path).cursor()
+        matches = []
+        seen = set()
+
+        def add(rows):
+            for row in rows:
+                if len(matches) < limit and row[1] not in seen:
+                    seen.add(row[1])
+                    matches.append(row)
+
+        add(_leading_prefix_matches(cursor, text, limit))
+        if len(matches) < limit:
+            add(_word_prefix_matches(cursor, text, limit))
+        all_words_query = _trigram_match_query(text)
+        any_word_query = _trigram_match_query(text, any_word=True)
+        if len(matches) < limit and all_words_query:
+            add(_trigram_matches(cursor, all_words_query, text, limit))
+        # Single-word queries would just repeat the previous pass
+        if len(matches) < limit and any_word_query and any_word_query != all_words_query:
+            add(_trigram_matches(cursor, any_word_query, text, limit))
+        return [_candidate_from_row(row) for row in matches]
+    except sqlite3.OperationalError as e:
+        st.error(f"Error searching candidates: {e}")
+        return []
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def save_feedback(candidate_email, interview_date, analysis, job_id=None):
+    """
+    Upsert one analysis (keyed by candidate email and interview date) and replace its
+    categories, Q&A pairs and pros/cons with bulk inserts in a single transaction.
+    `analysis` has the shape produced by run_analysis_pipeline.
+    """
+    categories_data = analysis["categories"]
+    all_qa_data = [qa for category in categories_data for qa in category["questions_and_answers"]]
+    average_score, recommendation, _, _ = generate_recommendation(all_qa_data)
+
+    conn = sqlite3.connect(CANDIDATE_DB)
+    try:
+        conn.execute("PRAGMA foreign_keys = ON")
+        cursor = conn.cursor()
+        cursor.execute("""
+        INSERT INTO analyses (candidate_email, interview_date, job_id, video_path, video_file_id, video_hash,
+                              video_duration, transcript_text, average_score, recommendation)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (candidate_email, interview_date) DO UPDATE SET
+            job_id = COALESCE(excluded.job_id, job_id),
+            video_path = excluded.video_path,
+            video_file_id = COALESCE(excluded.video_file_id, video_file_id),
+            video_hash = COALESCE(excluded.video_hash, video_hash),
+            video_duration = excluded.video_duration,
+            transcript_text = excluded.transcript_text,
+            average_score = excluded.average_score,
+            recommendation = excluded.recommendation,
+            updated_at = CURRENT_TIMESTAMP
+        """, (candidate_email, interview_date, job_id, analysis.get("video_path"), analysis.get("video_file_id"),
+              analysis.get("video_hash"), analysis.get("video_duration"), analysis.get("transcript_text"),
+              average_score, recommendation))
+        analysis_id = cursor.execute(
+            "SELECT id FROM analyses WHERE candidate_email = ? AND interview_date = ?",
+            (candidate_email, interview_date),
+        ).fetchone()[0]
+        cursor.execute("DELETE FROM feedback_categories WHERE analysis_id = ?", (analysis_id,))
+
+        cursor.executemany(
+            "INSERT INTO feedback_categories (analysis_id, position, name) VALUES (?, ?, ?)",
+            [(analysis_id, i, category["category"]) for i, category in enumerate(categories_data)],
+        )
+        category_ids = [row[0] for row in cursor.execute(
+            "SELECT id FROM feedback_categories WHERE analysis_id = ? ORDER BY position", (analysis_id,))]
+        cursor.executemany(
+            """INSERT INTO feedback_qa (category_id, position, question, answer, feedback_summary, score, start_time, end_time)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            [(category_ids[i], j, qa.get("question"), qa.get("answer"), qa["feedback"].get("feedback_summary"),
+              int(qa["feedback"].get("score") or 0), _to_float(qa.get("start_time")), _to_float(qa.get("end_time")))
+             for i, category in enumerate(categories_data)
+             for j, qa in enumerate(category["questions_and_answers"])],
+        )
+        qa_ids = [row[0] for row in cursor.execute("""
+            SELECT q.id FROM feedback_qa q JOIN feedback_categories c ON c.id = q.category_id
+            WHERE c.analysis_id = ? ORDER BY c.position, q.position
+        """, (analysis_id,))]
+        cursor.executemany(
+            "INSERT INTO feedback_points (qa_id, kind, position, text) VALUES (?, ?, ?, ?)",
+            [(qa_id, kind, k, text)
+             for qa_id, qa in zip(qa_ids, all_qa_data)
+             for kind, key in (("pro", "pros"), ("con", "cons"))
+             for k, text in enumerate(qa["feedback"].get(key) or [])
+             if text and text.strip()],
+        )
+        conn.commit()
+        return analysis_id
+    finally:
+        conn.close()
+
+def load_feedback(candidate_email, interview_date=None):
+    """
+    Load the stored analysis for a candidate (their latest interview unless a date is
+    given) with one indexed query, in the shape render_analysis_results expects.
+    """
+    conn = sqlite3.connect(CANDIDATE_DB)
+    try:
+        rows = conn.execute("""
+        SELECT a.video_path, a.video_duration, a.transcript_text, a.interview_date, a.video_file_id, a.video_hash,
+               c.id, c.name, q.question, q.answer, q.feedback_summary, q.score, q.start_time, q.end_time,
+               (SELECT json_group_array(text) FROM (SELECT text FROM feedback_points
+                    WHERE qa_id = q.id AND kind = 'pro' ORDER BY position)) AS pros,
+               (SELECT json_group_array(text) FROM (SELECT text FROM feedback_points
+                    WHERE qa_id = q.id AND kind = 'con' ORDER BY position)) AS cons
+        FROM analyses a
+        JOIN feedback_categories c ON c.analysis_id = a.id
+        LEFT JOIN feedback_qa q ON q.category_id = c.id
+        WHERE a.id = (
+            SELECT id FROM analyses
+            WHERE candidate_email = ? AND (? IS NULL OR interview_date = ?)
+            ORDER BY interview_date DESC LIMIT 1
+        )
+        ORDER BY c.position, q.position
+        """, (candidate_email, interview_date, interview_date)).fetchall()
+    finally:
+        conn.close()
+    if not rows:
+        return None
+
+    categories = {}
+    for row in rows:
+        block = categories.setdefault(row[6], {"category": row[7], "questions_and_answers": []})
+        if row[8] is None and row[9] is None:
+            continue
+        block["questions_and_answers"].append({
+            "question": row[8],
+            "answer": row[9],
+            "feedback": {
+                "feedback_summary": row[10],
+                "score": row[11],
+                "pros": json.loads(row[14]),
+                "cons": json.loads(row[15]),
+            },
+            "start_time": row[12],
+            "end_time": row[13],
+        })
+    return {
+        "video_path": rows[0][0],
+        "video_duration": rows[0][1],
+        "transcript_text": rows[0][2],
+        "interview_date": rows[0][3],
+        "video_file_id": rows[0][4],
+        "video_hash": rows[0][5],
+        "categories": list(categories.values()),
+    }
+
 def generate_recommendation(qa_data):
     """
     Calculate the average score and generate a recommendation based on the score range.
@@ -255,6 +1232,197 @@ def format_timestamp(seconds):
     seconds = int(seconds % 60)
     return f"{minutes:02d}:{seconds:02d}"
 
+def _question_start_times(categories_data):
+    start_times = []
+    for category in categories_data:
+        for result in category["questions_and_answers"]:
+            try:
+                start_times.append(float(result.get("start_time")))
+            except (ValueError, TypeError):
+                pass
+    return start_times
+
+def run_analysis_pipeline(job, reporter):
+    """
+    Download, transcribe and analyze one interview, reporting each stage to the job queue.
+    This runs on a worker thread, so nothing here touches Streamlit: failures raise and
+    end up in the job's error column, warnings go to reporter.note. Preview frames are extracted into the frame cache so the results page renders them
+    without decoding, and the feedback is saved to the candidate database. Returns the
+    JSON-serializable analysis result.
+    """
+    reporter.stage("download", 0.05)
+    video_path = download_video(job["video_link"])
+    try:
+        reporter.stage("duration", 0.25)
+        video_duration = get_video_duration(video_path, reporter.note)
+
+        reporter.stage("transcribe", 0.3)
+        transcription = transcribe_video(video_path, reporter.note)
+
+        reporter.stage("analyze", 0.6)
+        categories_data = analyze_transcription_and_generate_feedback(transcription, video_duration, reporter.partial,
+                                                                      reporter.note)
+        if not categories_data:
+            raise RuntimeError("Feedback generation returned no questions")
+
+        reporter.stage("frames", 0.9)
+        extract_frames(video_path, _question_start_times(categories_data), reporter.note)
+
+        analysis = {
+            "video_path": video_path,
+            "video_file_id": extract_drive_file_id(job["video_link"]),
+            "video_hash": video_content_hash(video_path),
+            "video_duration": video_duration,
+            "transcript_text": transcription.text,
+            "categories": categories_data,
+        }
+        reporter.stage("save", 0.95)
+        candidate_info = fetch_candidate_details(job["candidate_email"])
+        analysis["interview_date"] = (candidate_info or {}).get("InterviewDate") or time.strftime("%Y-%m-%d")
+        save_feedback(job["candidate_email"], analysis["interview_date"], analysis, job_id=job["id"])
+        return analysis
+    finally:
+        release_video(video_path)
+
+@st.cache_resource
+def get_job_queue():
+    """One worker pool per server process, shared by every session and rerun."""
+    return AnalysisJobQueue(run_analysis_pipeline)
+
+def show_job_notes(job):
+    """Render the warnings and notes the pipeline recorded on the job row."""
+    for note in job["notes"]:
+        st.caption(f"{note['stage'] or 'queued'}: {note['message']}")
+
+@st.fragment(run_every=2)
+def show_job_progress(job_queue, job_id, stream_feedback):
+    job = job_queue.get(job_id)
+    if job["status"] not in ("queued", "running"):
+        st.rerun()
+    stage = job["stage"] or "queued"
+    st.progress(job["progress"], text=f"Analysis {job['status']}: {stage}...")
+    show_job_notes(job)
+    if stream_feedback:
+        for item in job["partial"]:
+            qa = item["qa"]
+            st.write(f"**{item['category']}:** {qa.get('question', '')} "
+                     f"({qa.get('feedback', {}).get('score', '?')}/100)")
+
+def find_analysis_video(analysis):
+    """
+    The video of a stored analysis: its cache entry, found by Drive file ID and content
+    hash, else the path it was analyzed from (older analyses) if that still exists.
+    Returns None once the video has left the cache.
+    """
+    file_id, video_hash = analysis.get("video_file_id"), analysis.get("video_hash")
+    if file_id and video_hash and os.path.isdir(VIDEO_CACHE_DIR):
+        for name in os.listdir(VIDEO_CACHE_DIR):
+            path = os.path.join(VIDEO_CACHE_DIR, name)
+            if name.startswith(f"{file_id}-") and name.endswith(".mp4") and video_content_hash(path) == video_hash:
+                return path
+    video_path = analysis.get("video_path")
+    return video_path if video_path and os.path.exists(video_path) else None
+
+def render_analysis_results(analysis, candidate_email):
+    video_path = find_analysis_video(analysis)
+    video_duration = analysis["video_duration"]
+    categories_data = analysis["categories"]
+
+    if video_path:
+        st.video(video_path)  # Display the video directly in the form
+    else:
+        st.info("The interview video is no longer in the local cache; run the analysis again to watch it. "
+                "Cached preview frames are still shown below.")
+    if video_duration:
+        st.write(f"**Video Duration:** {format_timestamp(video_duration)}")
+
+    st.write("**Transcription:**")
+    st.write(analysis["transcript_text"])
+
+    st.write("**Extracted Data with Feedback:**")
+    st.json(categories_data)
+
+    # Preview frames were extracted by the job, so this is a disk cache read
+    start_times = _question_start_times(categories_data)
+    if video_path:
+        preview_frames = extract_frames(video_path, start_times, st.warning)
+    elif analysis.get("video_hash"):
+        preview_frames, _ = cached_frames(analysis["video_hash"], start_times)
+    else:
+        preview_frames = {}
+
+    st.subheader("Feedback Results")
+    for category in categories_data:
+        st.write(f"### Category: {category['category']}")
+        for result in category["questions_and_answers"]:
+            st.write(f"#### Question: {result['question']}")
+            st.write(f"**Answer:** {result['answer']}")
+            st.write(f"**Feedback Summary:** {result['feedback']['feedback_summary']}")
+            st.write(f"**Score:** {result['feedback']['score']}/100")
+            st.write("**Pros:**")
+            for pro in result["feedback"]["pros"]:
+                st.write(f"- {pro}")
+            st.write("**Cons:**")
+            for con in result["feedback"]["cons"]:
+                st.write(f"- {con}")
+
+            # Show first frame of the video segment with absolute timestamp
+            start_time = result.get("start_time")
+            if start_time is not None:
+                try:
+                    start_time = float(start_time)
+                    frame_image = preview_frames.get(start_time)
+                    if frame_image:
+                        st.write(f"**Video Preview at {format_timestamp(start_time)} (from start):**")
+                        st.image(frame_image, 
+                                 caption=f"Timestamp: {format_timestamp(start_time)} from video start",
+                                 use_container_width=True)
+                        # Add a link to jump to this time in the video
+                        st.markdown(f"[Jump to this point in video](#video-timestamp-{int(start_time)})")
+                except (ValueError, TypeError) as e:
+                    st.error(f"Error processing timestamps: {e}")
+            else:
+                st.warning("No timestamp available for this question.")
+            st.write("---")
+
+    # Calculate overall recommendation and aggregate pros/cons
+    all_qa_data = [qa for category in categories_data for qa in category["questions_and_answers"]]
+    average_score, recommendation, overall_pros, overall_cons = generate_recommendation(all_qa_data)
+    st.subheader("Overall Recommendation")
+    st.write(f"**Average Score:** {average_score}/100")
+    st.write(f"**Recommendation:** {recommendation}")
+
+    # Display overall pros and cons
+    st.write("**Overall Pros:**")
+    for pro in overall_pros:
+        st.write(f"- {pro}")
+
+    st.write("**Overall Cons:**")
+    for con in overall_cons:
+        st.write(f"- {con}")
+
+    st.subheader("Edit Feedback and Scores")
+    for i, category in enumerate(categories_data):
+        st.write(f"### Category: {category['category']}")
+        for j, result in enumerate(category["questions_and_answers"]):
+            st.write(f"#### Question: {result['question']}")
+            new_feedback_summary = st.text_area(f"Edit Feedback Summary for Question {j+1} in Category {i+1}", value=result['feedback']['feedback_summary'])
+            new_score = st.slider(f"Edit Score for Question {j+1} in Category {i+1}", 0, 100, value=int(result['feedback']['score']))
+            new_pros = st.text_area(f"Edit Pros for Question {j+1} in Category {i+1}", value="\n".join(result['feedback']['pros']))
+            new_cons = st.text_area(f"Edit Cons for Question {j+1} in Category {i+1}", value="\n".join(result['feedback']['cons']))
+
+            categories_data[i]["questions_and_answers"][j]['feedback']['feedback_summary'] = new_feedback_summary
+            categories_data[i]["questions_and_answers"][j]['feedback']['score'] = new_score
+            categories_data[i]["questions_and_answers"][j]['feedback']['pros'] = new_pros.split("\n")
+            categories_data[i]["questions_and_answers"][j]['feedback']['cons'] = new_cons.split("\n")
+
+    if st.button("Save Edited Feedback"):
+        try:
+            save_feedback(candidate_email, analysis["interview_date"], analysis)
+            st.success("Feedback saved successfully!")
+        except sqlite3.Error as e:
+            st.error(f"Error saving feedback: {e}")
+
 def main():
     initialize_database()
 
@@ -265,6 +1433,11 @@ def main():
     candidate_identifier = st.text_input("Enter Candidate Email or Name", placeholder="e.g., john.doe@example.com or John Doe")
     if candidate_identifier:
         candidate_info = fetch_candidate_details(candidate_identifier)
+        if not candidate_info:
+            matches = search_candidates(candidate_identifier)
+            if matches:
+                options = {f"{match['Name']} <{match['Email']}>": match for match in matches}
+                candidate_info = options[st.selectbox("Matching candidates", list(options))]
         if candidate_info:
             candidate_name = candidate_info["Name"]
             candidate_email = candidate_info["Email"]
@@ -278,103 +1451,32 @@ def main():
             st.write(f"**Applied Role:** {applied_role}")
 
             st.subheader("Video Analysis")
+            job_queue = get_job_queue()
+            stream_feedback = st.checkbox("Show feedback as it is generated", value=True)
             if st.button("Analyze Video"):
-                with st.spinner("Downloading video..."):
-                    video_path = download_video(video_link)
-                    if video_path:
-                        st.video(video_path)  # Display the video directly in the form
-
-                        with st.spinner("Getting video duration..."):
-                            video_duration = get_video_duration(video_path)
-                            if video_duration:
-                                st.write(f"**Video Duration:** {format_timestamp(video_duration)}")
-
-                        with st.spinner("Transcribing video..."):
-                            transcription = transcribe_video(video_path)
-
-                            if transcription:
-                                st.write("**Transcription:**")
-                                st.write(transcription.text)
-
-                                st.write("**Analyzing Transcription and Generating Feedback...**")
-                                categories_data = analyze_transcription_and_generate_feedback(transcription, video_duration)
-
-                                if categories_data:
-                                    st.write("**Extracted Data with Feedback:**")
-                                    st.json(categories_data)
-
-                                    st.subheader("Feedback Results")
-                                    for category in categories_data:
-                                        st.write(f"### Category: {category['category']}")
-                                        for result in category["questions_and_answers"]:
-                                            st.write(f"#### Question: {result['question']}")
-                                            st.write(f"**Answer:** {result['answer']}")
-                                            st.write(f"**Feedback Summary:** {result['feedback']['feedback_summary']}")
-                                            st.write(f"**Score:** {result['feedback']['score']}/100")
-                                            st.write("**Pros:**")
-                                            for pro in result["feedback"]["pros"]:
-                                                st.write(f"- {pro}")
-                                            st.write("**Cons:**")
-                                            for con in result["feedback"]["cons"]:
-                                                st.write(f"- {con}")
-
-                                            # Show first frame of the video segment with absolute timestamp
-                                            start_time = result.get("start_time")
-                                            if start_time is not None:
-                                                try:
-                                                    start_time = float(start_time)
-                                                    frame_image = get_first_frame(video_path, start_time)
-                                                    if frame_image:
-                                                        st.write(f"**Video Preview at {format_timestamp(start_time)} (from start):**")
-                                                        st.image(frame_image, 
-                                                                 caption=f"Timestamp: {format_timestamp(start_time)} from video start",
-                                                                 use_container_width=True)
-                                                        # Add a link to jump to this time in the video
-                                                        st.markdown(f"[Jump to this point in video](#video-timestamp-{int(start_time)})")
-                                                except (ValueError, TypeError) as e:
-                                                    st.error(f"Error processing timestamps: {e}")
-                                            else:
-                                                st.warning("No timestamp available for this question.")
-                                            st.write("---")
-
-                                    # Calculate overall recommendation and aggregate pros/cons
-                                    all_qa_data = [qa for category in categories_data for qa in category["questions_and_answers"]]
-                                    average_score, recommendation, overall_pros, overall_cons = generate_recommendation(all_qa_data)
-                                    st.subheader("Overall Recommendation")
-                                    st.write(f"**Average Score:** {average_score}/100")
-                                    st.write(f"**Recommendation:** {recommendation}")
-
-                                    # Display overall pros and cons
-                                    st.write("**Overall Pros:**")
-                                    for pro in overall_pros:
-                                        st.write(f"- {pro}")
-
-                                    st.write("**Overall Cons:**")
-                                    for con in overall_cons:
-                                        st.write(f"- {con}")
-
-                                    st.subheader("Edit Feedback and Scores")
-                                    for i, category in enumerate(categories_data):
-                                        st.write(f"### Category: {category['category']}")
-                                        for j, result in enumerate(category["questions_and_answers"]):
-                                            st.write(f"#### Question: {result['question']}")
-                                            new_feedback_summary = st.text_area(f"Edit Feedback Summary for Question {j+1} in Category {i+1}", value=result['feedback']['feedback_summary'])
-                                            new_score = st.slider(f"Edit Score for Question {j+1} in Category {i+1}", 0, 100, value=int(result['feedback']['score']))
-                                            new_pros = st.text_area(f"Edit Pros for Question {j+1} in Category {i+1}", value="\n".join(result['feedback']['pros']))
-                                            new_cons = st.text_area(f"Edit Cons for Question {j+1} in Category {i+1}", value="\n".join(result['feedback']['cons']))
-
-                                            categories_data[i]["questions_and_answers"][j]['feedback']['feedback_summary'] = new_feedback_summary
-                                            categories_data[i]["questions_and_answers"][j]['feedback']['score'] = new_score
-                                            categories_data[i]["questions_and_answers"][j]['feedback']['pros'] = new_pros.split("\n")
-                                            categories_data[i]["questions_and_answers"][j]['feedback']['cons'] = new_cons.split("\n")
-
-                                    if st.button("Save Edited Feedback"):
-                                        st.success("Feedback saved successfully!")
-                                        st.json(categories_data)
+                st.session_state[f"analysis_job_{candidate_email}"] = job_queue.submit(candidate_email, video_link)
+
+            # Finished analyses (and any saved edits) are read back from the feedback tables,
+            # so earlier results reopen instantly across reruns and restarts
+            job_id = st.session_state.get(f"analysis_job_{candidate_email}")
+            job = job_queue.get(job_id) if job_id else job_queue.latest_for(candidate_email)
+            if job and job["status"] in ("queued", "running"):
+                show_job_progress(job_queue, job["id"], stream_feedback)
+            else:
+                if job and job["status"] == "failed":
+                    st.error(f"Analysis failed during {job['stage'] or 'startup'}: {job['error']}")
+                if job:
+                    show_job_notes(job)
+                analysis = load_feedback(candidate_email)
+                if analysis:
+                    render_analysis_results(analysis, candidate_email)
         else:
             st.error("Candidate not found in the database. Please check the email or name.")
     else:
         st.error("Please enter a candidate email or name to retrieve details.")
 
+    with st.expander("HTTP client stats"):
+        st.json(get_http_client().stats())
+
 if __name__ == "__main__":
     main()
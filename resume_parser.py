@@ -1,4 +1,3 @@
-import google.generativeai as genai
 from pdfminer.high_level import extract_text
 from docx import Document
 from datetime import datetime
@@ -7,9 +6,14 @@ import os
 import re
 from dotenv import load_dotenv
 
+from http_client import HTTP_CONNECT_TIMEOUT, get_http_client
+
 # Load environment variables
 load_dotenv()
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
+GEMINI_MODEL = 'gemini-2.0-flash-thinking-exp-01-21'
+GEMINI_READ_TIMEOUT = float(os.getenv("GEMINI_READ_TIMEOUT", "300"))
 
 def extract_resume_text(file_path):
     """Extracts text from a resume file (PDF, DOCX, or DOC)."""
@@ -39,6 +43,21 @@ def convert_doc_to_docx(doc_path, docx_path):
     except Exception as e:
         print(f"Error converting DOC to DOCX: {e}")
 
+def generate_gemini_content(prompt):
+    """Call the Gemini REST API through the shared HTTP client and return the response text."""
+    response = get_http_client().post(
+        GEMINI_API_URL.format(model=GEMINI_MODEL),
+        headers={"x-goog-api-key": GOOGLE_API_KEY},
+        json={"contents": [{"parts": [{"text": prompt}]}]},
+        timeout=(HTTP_CONNECT_TIMEOUT, GEMINI_READ_TIMEOUT),
+    )
+    response.raise_for_status()
+    data = response.json()
+    candidates = data.get("candidates") or []
+    if not candidates:
+        raise ValueError(f"Gemini returned no candidates: {data.get('promptFeedback')}")
+    return "".join(part.get("text", "") for part in candidates[0].get("content", {}).get("parts", []))
+
 def parse_resumes_in_batch(texts):
     """
     Uses Gemini to parse multiple resumes in a single API request.
@@ -73,10 +92,8 @@ def parse_resumes_in_batch(texts):
     )
     combined_prompt += "\n---\n".join([f"RESUME {i+1}:\n{text}" for i, text in enumerate(texts)])
 
-    model = genai.GenerativeModel('gemini-2.0-flash-thinking-exp-01-21')
     try:
-        response = model.generate_content(combined_prompt)
-        raw_response = response.text.strip()
+        raw_response = generate_gemini_content(combined_prompt).strip()
     except Exception as e:
         print(f"Error generating Gemini response: {e}")
         return []